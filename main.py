@@ -1,23 +1,38 @@
+import asyncio
+
 from fastapi import HTTPException, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 
 from src.config.db.redis_management.redis_manager import redis_manager, get_redis
+from src.config.db.mongo_management.async_mongo_manager import async_mongo_manager, ensure_indexes
+from src.config.db.postgres_management.pg_manager import async_engine
 from src.apps.app_router import app_router
+from src.apps.api_key.cache import listen_for_api_key_invalidations
+from src.apps.waitlist.write_behind import run_stream_flusher
+from src.apps.waitlist.live import signup_broker
 from src.apps.base.exception_handler import http_custom_exception_handler
 from src.config.logs.sentry_management.sentry_manager import initialize_sentry
 
-from slowapi.errors import RateLimitExceeded
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     redis = await get_redis()
+    await ensure_indexes()
+    background_tasks = [
+        asyncio.create_task(listen_for_api_key_invalidations(redis)),
+        # Runs in every mode so entries buffered before a switch back to
+        # direct ingest are still flushed.
+        asyncio.create_task(run_stream_flusher(redis)),
+    ]
     yield
+    for task in background_tasks:
+        task.cancel()
+    await signup_broker.close()
     await redis_manager.close()
+    async_mongo_manager.close()
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -30,11 +45,6 @@ app = FastAPI(
 )
 
 
-limiter = Limiter(key_func=get_remote_address)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
-
 # initialize_sentry()
 
 app.add_exception_handler(HTTPException, http_custom_exception_handler)
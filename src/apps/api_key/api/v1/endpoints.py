@@ -1,10 +1,12 @@
 from uuid import uuid4
 from fastapi import APIRouter, HTTPException, Request, Depends, status
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from redis.asyncio import Redis
 from typing import Annotated, Optional, List
 
-from src.config.db.postgres_management.pg_manager import get_db, engine
+from src.config.db.postgres_management.pg_manager import get_async_db, engine
+from src.config.db.redis_management.redis_manager import get_redis
 from src.apps.api_key.models import APIKey
 from src.apps.api_key.schemas.api_key_schema import APIKeySchema
 from src.apps.base.schemas.reponse_types import (
@@ -18,6 +20,8 @@ from src.apps.base.schemas.reponse_types import (
     TooManyRequestsReponse,
 )
 from src.apps.api_key.service import get_project_api_keys, verify_api_key, create_api_key_response_data, create_api_key, verify_project_api_key, update_api_key_alias, delete_api_key
+from src.apps.api_key.cache import invalidate_api_key_cache
+from src.apps.base.http_cache import cached_get, bump_resource_versions, api_keys_resource
 from src.apps.projects.service import get_project_by_project_id
 from src.apps.auth.utils.password import oauth2_scheme
 from src.apps.auth.service import get_current_user
@@ -47,31 +51,36 @@ router = APIRouter(prefix="/v1")
     tags=["API Keys"],
 )
 async def get_api_keys(
+    request: Request,
     project_uiid: str,
     token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = await get_current_user(db=db, token=token)
-    project = get_project_by_project_id(db, project_uiid, user.id)
-
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Project not found",
+    async def build():
+        user = await get_current_user(db=db, token=token)
+        project = await get_project_by_project_id(db, project_uiid, user.id)
+
+        if not project:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Project not found",
+            )
+        api_keys = await get_project_api_keys(db, project.id)
+
+        api_key_data = [create_api_key_response_data(api_key) for api_key in api_keys]
+
+        response = ResponseSchema[List[APIKeySchema]](
+            data=api_key_data,
+            message="API keys retrieved successfully",
         )
-    api_keys = get_project_api_keys(db, project.id)
-
-    api_key_data = [create_api_key_response_data(api_key) for api_key in api_keys]
 
-    response = ResponseSchema[List[APIKeySchema]](
-        data=api_key_data,
-        message="API keys retrieved successfully",
-    )
+        return JSONResponse(
+            content=response.dict(),
+            status_code=status.HTTP_200_OK,
+        )
 
-    return JSONResponse(
-        content=response.dict(),
-        status_code=status.HTTP_200_OK,
-    )
+    return await cached_get(request, redis, token, api_keys_resource(project_uiid), build)
 
 
 @router.post(
@@ -96,10 +105,11 @@ async def get_api_keys(
 async def add_api_key(
     project_uiid: str,
     token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    db: AsyncSession = Depends(get_async_db),
 ):
     user = await get_current_user(db=db, token=token)
-    project = get_project_by_project_id(db, project_uiid, user.id)
+    project = await get_project_by_project_id(db, project_uiid, user.id)
 
     if not project:
         raise HTTPException(
@@ -107,7 +117,8 @@ async def add_api_key(
             detail="Project not found",
         )
 
-    api_key = create_api_key(db, project.id, str(uuid4()))
+    api_key = await create_api_key(db, project.id, str(uuid4()))
+    await bump_resource_versions(redis, api_keys_resource(project_uiid))
 
     api_key_data = create_api_key_response_data(api_key)
 
@@ -145,11 +156,12 @@ async def update_api_key(
     project_uiid: str,
     pk: int,
     token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    db: AsyncSession = Depends(get_async_db),
 ):
     alias = request.query_params.get('alias')
     user = await get_current_user(db=db, token=token)
-    project = get_project_by_project_id(db, project_uiid, user.id)
+    project = await get_project_by_project_id(db, project_uiid, user.id)
 
     if not project:
         raise HTTPException(
@@ -157,7 +169,7 @@ async def update_api_key(
             detail="Project not found",
         )
 
-    api_key = verify_project_api_key(db, pk, project.id)
+    api_key = await verify_project_api_key(db, pk, project.id)
 
     if not api_key:
         raise HTTPException(
@@ -165,7 +177,9 @@ async def update_api_key(
             detail="API key not found",
         )
     
-    api_key = update_api_key_alias(db, api_key, alias)
+    api_key = await update_api_key_alias(db, api_key, alias)
+    await invalidate_api_key_cache(redis, api_key.key)
+    await bump_resource_versions(redis, api_keys_resource(project_uiid))
 
     return JSONResponse(
         content={"message": "API key updated successfully"},
@@ -196,10 +210,11 @@ async def delete_api_key_endpoint(
     project_uiid: str,
     pk: int,
     token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    db: AsyncSession = Depends(get_async_db),
 ):
     user = await get_current_user(db=db, token=token)
-    project = get_project_by_project_id(db, project_uiid, user.id)
+    project = await get_project_by_project_id(db, project_uiid, user.id)
 
     if not project:
         raise HTTPException(
@@ -207,7 +222,7 @@ async def delete_api_key_endpoint(
             detail="Project not found",
         )
 
-    api_key = verify_project_api_key(db, pk, project.id)
+    api_key = await verify_project_api_key(db, pk, project.id)
 
     if not api_key:
         raise HTTPException(
@@ -215,7 +230,10 @@ async def delete_api_key_endpoint(
             detail="API key not found",
         )
 
-    delete_api_key(db, api_key)
+    key = api_key.key
+    await delete_api_key(db, api_key)
+    await invalidate_api_key_cache(redis, key)
+    await bump_resource_versions(redis, api_keys_resource(project_uiid))
 
     return JSONResponse(
         content={"message": "API key deleted successfully"},
@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import logging
+from typing import Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.settings import (
+    API_KEY_CACHE_MAX_SIZE,
+    API_KEY_LOCAL_CACHE_TTL,
+    API_KEY_REDIS_CACHE_TTL,
+    API_KEY_NEGATIVE_CACHE_TTL,
+)
+from src.apps.base.cache import TTLCache, MISSING
+from .schemas.api_key_schema import VerifiedAPIKeySchema
+from .service import verify_api_key
+
+logger = logging.getLogger(__name__)
+
+API_KEY_CACHE_PREFIX = "api_key:verify:"
+API_KEY_INVALIDATION_CHANNEL = "api_key:invalidate"
+INVALID_API_KEY_MARKER = "invalid"
+
+_local_cache = TTLCache(max_size=API_KEY_CACHE_MAX_SIZE, ttl=API_KEY_LOCAL_CACHE_TTL)
+
+
+def _cache_key(key: str) -> str:
+    # Raw keys are credentials, so only their digest is written to Redis.
+    return API_KEY_CACHE_PREFIX + hashlib.sha256(key.encode()).hexdigest()
+
+
+async def get_verified_api_key(db: AsyncSession, redis: Redis, key: Optional[str]) -> Optional[VerifiedAPIKeySchema]:
+    """
+    Verify an API key through the in-process cache, then Redis, then Postgres.
+
+    Unknown keys are cached as well (for a shorter time) so a flood of
+    invalid keys does not turn into a flood of database queries.
+
+    Args:
+        db (AsyncSession): The database session.
+        redis (Redis): The Redis client.
+        key (str): The API key sent by the client.
+
+    Returns:
+        VerifiedAPIKeySchema: The API key, or ``None`` when it is not valid.
+    """
+    if not key:
+        return None
+
+    cache_key = _cache_key(key)
+    verified = _local_cache.get(cache_key)
+    if verified is not MISSING:
+        return verified
+
+    cached = await redis.get(cache_key)
+    if cached is not None:
+        verified = None if cached == INVALID_API_KEY_MARKER else VerifiedAPIKeySchema.model_validate_json(cached)
+    else:
+        api_key = await verify_api_key(db, key)
+        verified = VerifiedAPIKeySchema(
+            id=api_key.id,
+            project_id=api_key.project_id,
+            project_limit=api_key.project.limit,
+        ) if api_key else None
+        if verified:
+            await redis.set(cache_key, verified.model_dump_json(), ex=API_KEY_REDIS_CACHE_TTL)
+        else:
+            await redis.set(cache_key, INVALID_API_KEY_MARKER, ex=API_KEY_NEGATIVE_CACHE_TTL)
+
+    _local_cache.set(cache_key, verified, ttl=None if verified else API_KEY_NEGATIVE_CACHE_TTL)
+    return verified
+
+
+async def invalidate_api_key_cache(redis: Redis, key: str):
+    """
+    Drop an API key from every cache tier, on every worker.
+
+    Args:
+        redis (Redis): The Redis client.
+        key (str): The API key.
+    """
+    cache_key = _cache_key(key)
+    _local_cache.delete(cache_key)
+    await redis.delete(cache_key)
+    await redis.publish(API_KEY_INVALIDATION_CHANNEL, cache_key)
+
+
+async def listen_for_api_key_invalidations(redis: Redis):
+    """
+    Evict API keys from this worker's local cache as other workers invalidate them.
+
+    Runs for the lifetime of the app. Invalidations sent while the
+    subscription is down are lost, so the local cache is cleared on reconnect.
+    Any failure is logged and the subscription retried with backoff; a dead
+    listener would let revoked keys keep working until their cache TTL ran out.
+    """
+    backoff = 1
+    while True:
+        pubsub = redis.pubsub()
+        try:
+            await pubsub.subscribe(API_KEY_INVALIDATION_CHANNEL)
+            _local_cache.clear()
+            backoff = 1
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    _local_cache.delete(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except RedisConnectionError as e:
+            logger.warning("API key invalidation subscription lost: %s", e)
+        except Exception:
+            logger.exception("API key invalidation listener failed")
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                logger.debug("Could not close the API key invalidation subscription", exc_info=True)
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 30)
@@ -10,4 +10,13 @@ class APIKeySchema(BaseModel):
     created_at: str
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class VerifiedAPIKeySchema(BaseModel):
+    id: int
+    project_id: int
+    project_limit: Optional[int] = None
+
+    class Config:
+        from_attributes = True
@@ -1,61 +1,65 @@
 from typing import Optional
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from .models import APIKey
 from src.apps.projects.models import Project
 from .schemas.api_key_schema import APIKeySchema
 
 
-def get_project_api_keys(db: Session, project_id: int):
+async def get_project_api_keys(db: AsyncSession, project_id: int):
     """
     Get all API keys by project id from the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         project_id (int): The id of the project.
 
     Returns:
-        APIKey: The API key object.
+        List[APIKey]: The API key objects.
     """
-    return db.query(APIKey).filter(APIKey.project_id == project_id)
+    result = await db.execute(select(APIKey).where(APIKey.project_id == project_id))
+    return result.scalars().all()
 
-def verify_project_api_key(db: Session, pk: int, project_id: int):
+async def verify_project_api_key(db: AsyncSession, pk: int, project_id: int):
     """
     Verify the API key by project id and key.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         project_id (int): The id of the project.
         pk (int): The API key id.
 
     Returns:
         APIKey: The API key object.
     """
-    return db.query(APIKey).filter(APIKey.project_id == project_id, APIKey.id == pk).first()
+    result = await db.execute(select(APIKey).where(APIKey.project_id == project_id, APIKey.id == pk))
+    return result.scalars().first()
 
 
-def verify_api_key(db: Session, key: str):
+async def verify_api_key(db: AsyncSession, key: str):
     """
     Get the validity of the API key from the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         key (str): The API key.
 
     Returns:
-        APIKey: The API key object.
+        APIKey: The API key object, with its project loaded.
     """
-    
-    return db.query(APIKey).filter(APIKey.key == key).first()
+    result = await db.execute(select(APIKey).options(joinedload(APIKey.project)).where(APIKey.key == key))
+    return result.scalars().first()
 
 
-def create_api_key(db: Session, project_id: int, key: str, alias: Optional[str] = None):
+async def create_api_key(db: AsyncSession, project_id: int, key: str, alias: Optional[str] = None):
     """
     Create an API key in the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         project_id (int): The id of the project.
         key (str): The API key.
         alias (str, optional): The alias of the API key. Defaults to None.
@@ -65,16 +69,16 @@ def create_api_key(db: Session, project_id: int, key: str, alias: Optional[str]
     """
     api_key = APIKey(project_id=project_id, key=key, alias=alias)
     db.add(api_key)
-    db.commit()
-    db.refresh(api_key)
+    await db.commit()
+    await db.refresh(api_key)
     return api_key
 
-def update_api_key_alias(db: Session, api_key: APIKey, alias: str):
+async def update_api_key_alias(db: AsyncSession, api_key: APIKey, alias: str):
     """
     Update the alias of the API key in the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         api_key (APIKey): The API key object.
         alias (str): The alias of the API key.
     
@@ -82,23 +86,23 @@ def update_api_key_alias(db: Session, api_key: APIKey, alias: str):
         APIKey: The API key object.
     """
     api_key.alias = alias
-    db.commit()
-    db.refresh(api_key)
+    await db.commit()
+    await db.refresh(api_key)
     return api_key
 
-def delete_api_key(db: Session, api_key: APIKey):
+async def delete_api_key(db: AsyncSession, api_key: APIKey):
     """
     Delete the API key from the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         api_key (APIKey): The API key object.
     """
     try:
-        db.delete(api_key)
-        db.commit()
+        await db.delete(api_key)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e),
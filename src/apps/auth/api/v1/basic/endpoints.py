@@ -1,9 +1,9 @@
 from fastapi import APIRouter, HTTPException, Request, Depends, status
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 
-from src.config.db.postgres_management.pg_manager import get_db, engine
+from src.config.db.postgres_management.pg_manager import get_async_db, engine
 from src.apps.auth.service import (
     create_user,
     get_user_by_email,
@@ -60,7 +60,7 @@ router = APIRouter(prefix="/v1")
     tags=["Auth"],
 )
 async def register_user(
-    request: Request, payload: CeateUserSchema, db: Session = Depends(get_db)
+    request: Request, payload: CeateUserSchema, db: AsyncSession = Depends(get_async_db)
 ) -> JSONResponse:
 
     if not payload.email:
@@ -68,12 +68,12 @@ async def register_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Please add Email",
         )
-    if get_user_by_email(db, payload.email):
+    if await get_user_by_email(db, payload.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"User with email {payload.email} already exists",
         )
-    elif get_user_by_username(db, payload.username):
+    elif await get_user_by_username(db, payload.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"User with username {payload.username} already exists",
@@ -81,7 +81,7 @@ async def register_user(
     if not payload.username:
         payload.username = payload.email
 
-    user = create_user(db=db, user=payload)
+    user = await create_user(db=db, user=payload)
 
     if not user:
         raise HTTPException(status_code=502, detail="Bad Gateway")
@@ -118,10 +118,10 @@ async def register_user(
     tags=["Auth"],
 )
 async def login_user(
-    request: Request, payload: LoginUserSchema, db: Session = Depends(get_db)
+    request: Request, payload: LoginUserSchema, db: AsyncSession = Depends(get_async_db)
 ) -> JSONResponse:
 
-    user = verify_user(db, payload.email, payload.password)
+    user = await verify_user(db, payload.email, payload.password)
 
     if not user:
         raise HTTPException(
@@ -164,7 +164,7 @@ async def refresh_token(
     request: Request,
     # token: Annotated[str, Depends(oauth2_scheme)],
     payload: RefreshTokenSchema,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> JSONResponse:
 
     current_user = await get_current_user(db=db, token=payload.refresh)
@@ -210,7 +210,7 @@ async def change_password(
     request: Request,
     token: Annotated[str, Depends(oauth2_scheme)],
     payload: ChangePasswordSchema,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> JSONResponse:
 
     if payload.new_password != payload.confirm_password:
@@ -227,7 +227,7 @@ async def change_password(
             detail="Check your old password and try again.",
         )
 
-    user = update_password(db, user, payload.new_password)
+    user = await update_password(db, user, payload.new_password)
 
     return JSONResponse(
         status_code=200,
@@ -257,7 +257,7 @@ async def change_password(
 async def get_user_details(
     request: Request, 
     token: Annotated[str, Depends(oauth2_scheme)], 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> JSONResponse:
 
     user = await get_current_user(db=db, token=token)
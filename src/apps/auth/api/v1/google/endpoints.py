@@ -2,11 +2,11 @@ from src.apps.auth.utils.google_auth import google_get_access_token, google_get_
 from urllib.parse import urlencode
 from fastapi import APIRouter, Depends, Request, HTTPException, status
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated, Optional
 
 from src.config.settings import BASE_FRONTEND_URL
-from src.config.db.postgres_management.pg_manager import get_db, engine
+from src.config.db.postgres_management.pg_manager import get_async_db, engine
 from src.apps.auth.models import User
 from src.apps.auth.schemas.google_schema import GoogleInputSchema
 from src.apps.auth.service import (
@@ -65,7 +65,7 @@ router = APIRouter(prefix="/google/v1")
 async def google_login(
     request: Request,
     # query_params: GoogleInputSchema = Depends(),  # Validate query parameters
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     # Access validated query parameters
     query_params = request.query_params
@@ -87,7 +87,7 @@ async def google_login(
     google_access_token = google_get_access_token(code=code, redirect_uri=f"{BASE_FRONTEND_URL}/google")
     user_info = google_get_user_info(access_token=google_access_token)
 
-    user = get_user_by_email(db, user_info.get("email"))
+    user = await get_user_by_email(db, user_info.get("email"))
 
     if not user:
 
@@ -100,7 +100,7 @@ async def google_login(
             img_url=user_info.get("picture"),
         )
 
-        user = create_user(db=db, user=user)
+        user = await create_user(db=db, user=user)
 
         if not user:
             raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Bad Gateway")
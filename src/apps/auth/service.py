@@ -1,6 +1,7 @@
 import random
 import string
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated, Optional
 from fastapi import HTTPException, status, Depends
 import jwt
@@ -11,47 +12,49 @@ from .schemas.user_schema import CeateUserSchema
 from .utils.password import secure_pwd, verify_pwd, oauth2_scheme
 
 
-def get_user_by_username(db: Session, username: str):
+async def get_user_by_username(db: AsyncSession, username: str):
     """
     Get a user by username from the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         username (str): The username of the user.
 
     Returns:
         User: The user object.
     """
-    return db.query(User).filter(User.username == username).first()
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
 
 
-def get_user_by_email(db: Session, email: str):
+async def get_user_by_email(db: AsyncSession, email: str):
     """
     Get a user by email from the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         email (str): The email of the user.
 
     Returns:
         User: The user object.
     """
-    return db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
 
-def verify_user(db: Session, email: str, password: str):
+async def verify_user(db: AsyncSession, email: str, password: str):
     """
     Verify the user by username and password.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         email (str): The email of the user.
         password (str): The password of the user.
 
     Returns:
         User: The user object.
     """
-    user = get_user_by_email(db, email)
+    user = await get_user_by_email(db, email)
     if not user:
         return False
     if not verify_pwd(password, user.hashed_password):
@@ -59,12 +62,12 @@ def verify_user(db: Session, email: str, password: str):
     return user
 
 
-def create_user(db: Session, user: CeateUserSchema):
+async def create_user(db: AsyncSession, user: CeateUserSchema):
     """
     Create a new user in the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         user (CeateUserSchema): The user data to be created.
 
     Returns:
@@ -74,17 +77,17 @@ def create_user(db: Session, user: CeateUserSchema):
     hassed_password = secure_pwd(user.password)
     _user.hashed_password = hassed_password
     db.add(_user)
-    db.commit()
-    db.refresh(_user)
+    await db.commit()
+    await db.refresh(_user)
     return _user
 
 
-def update_password(db: Session, user: User, new_password: str):
+async def update_password(db: AsyncSession, user: User, new_password: str):
     """
     Update the password of the user.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         user (User): The user object.
         new_password (str): The new password.
 
@@ -93,29 +96,30 @@ def update_password(db: Session, user: User, new_password: str):
     """
     hashed_password = secure_pwd(new_password)
     user.hashed_password = hashed_password
-    db.commit()
+    await db.commit()
     return user
 
-def get_token(db: Session, token: str):
+async def get_token(db: AsyncSession, token: str):
     """
     Get a token by token from the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         token (str): The token.
 
     Returns:
         Token: The token object.
     """
-    return db.query(Token).filter(Token.token == token).firt()
+    result = await db.execute(select(Token).where(Token.token == token))
+    return result.scalars().first()
 
 
-def create_token(db: Session, token: str, user_id: int):
+async def create_token(db: AsyncSession, token: str, user_id: int):
     """
     Create a new token in the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         token (str): The token.
         user_id (int): The user id.
 
@@ -124,12 +128,12 @@ def create_token(db: Session, token: str, user_id: int):
     """
     _token = Token(token=token, user_id=user_id)
     db.add(_token)
-    db.commit()
-    db.refresh(_token)
+    await db.commit()
+    await db.refresh(_token)
     return _token
 
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Session):
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: AsyncSession):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -144,7 +148,7 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Se
             raise credentials_exception
     except jwt.InvalidTokenError as exc:
         raise credentials_exception from exc
-    user = get_user_by_username(db=db, username=username)
+    user = await get_user_by_username(db=db, username=username)
     if user is None:
         raise credentials_exception
     return user
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Request
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import HTMLResponse, JSONResponse
+from redis.asyncio import Redis
 
-from src.config.settings import BASE_DIR, templates
+from src.config.settings import BASE_DIR, templates, WAITLIST_INGEST_MODE, WAITLIST_STREAM_MAX_LAG
+from src.config.db.redis_management.redis_manager import get_redis
+from src.apps.waitlist.write_behind import get_stream_lag
 
 router = APIRouter(prefix="")
 
@@ -10,3 +13,26 @@ router = APIRouter(prefix="")
 async def landing_page(request: Request):
 
     return templates.TemplateResponse(request=request, name="home.html")
+
+
+@router.get(
+    "/health",
+    summary="Health check",
+    responses={
+        200: {"description": "The app is up; `ingest` shows how far the signup stream is behind"},
+    },
+    tags=["Base"],
+)
+async def health(redis: Redis = Depends(get_redis)) -> JSONResponse:
+    stream_lag = await get_stream_lag(redis)
+
+    return JSONResponse(
+        content={
+            "status": "ok",
+            "ingest": {
+                "mode": WAITLIST_INGEST_MODE,
+                "stream_lag": stream_lag,
+                "max_lag": WAITLIST_STREAM_MAX_LAG,
+            },
+        }
+    )
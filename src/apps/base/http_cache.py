@@ -0,0 +1,208 @@
+import hashlib
+import hmac
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Awaitable, Callable, Optional
+from uuid import uuid4
+
+import jwt
+from fastapi import Request, status
+from fastapi.responses import Response
+from redis.asyncio import Redis
+
+from src.config import settings
+
+HTTP_CACHE_KEY_PREFIX = "http_cache:"
+
+
+def _version_key(resource: str) -> str:
+    return f"{HTTP_CACHE_KEY_PREFIX}version:{resource}"
+
+
+def _body_key(etag: str) -> str:
+    return HTTP_CACHE_KEY_PREFIX + "body:" + etag.strip('"')
+
+
+def _project_ref_key(project_uuid: str) -> str:
+    return f"{HTTP_CACHE_KEY_PREFIX}project_ref:{project_uuid}"
+
+
+def projects_resource(username: str) -> str:
+    return f"user:{username}:projects"
+
+
+def project_resource(project_uuid: str) -> str:
+    return f"project:{project_uuid}"
+
+
+def api_keys_resource(project_uuid: str) -> str:
+    return f"project:{project_uuid}:api_keys"
+
+
+def waitlist_resource(project_id: int) -> str:
+    return f"waitlist:{project_id}"
+
+
+def _new_version() -> str:
+    # The timestamp doubles as Last-Modified; the suffix keeps same-second bumps apart.
+    return f"{time.time():.6f}-{uuid4().hex[:8]}"
+
+
+async def bump_resource_versions(redis: Redis, *resources: str):
+    """
+    Mark resources as changed so cached responses and ETags for them stop matching.
+
+    Args:
+        redis (Redis): The Redis client.
+        resources (str): The resources, e.g. ``project:<uuid>``.
+    """
+    if not resources:
+        return
+    version = _new_version()
+    async with redis.pipeline(transaction=True) as pipe:
+        for resource in resources:
+            pipe.set(_version_key(resource), version, ex=settings.HTTP_CACHE_VERSION_TTL)
+        await pipe.execute()
+
+
+async def get_resource_version(redis: Redis, resource: str) -> str:
+    """
+    Get the current version of a resource, giving it one if it has none yet.
+
+    Any resource string a caller sends gets a version here, before access to
+    it has been checked, so version keys always carry a TTL.
+    """
+    version = await redis.get(_version_key(resource))
+    if version is None:
+        await redis.set(_version_key(resource), _new_version(), nx=True, ex=settings.HTTP_CACHE_VERSION_TTL)
+        version = await redis.get(_version_key(resource))
+    return version
+
+
+def get_version_time(version: str) -> float:
+    """
+    Get the time a resource version was issued, as a Unix timestamp.
+    """
+    return float(version.split("-")[0])
+
+
+async def remember_project_ref(redis: Redis, project_uuid: str, project_id: int):
+    """
+    Remember the database id behind a project uuid, for resources keyed by the id.
+    """
+    await redis.set(_project_ref_key(project_uuid), project_id)
+
+
+async def get_project_ref(redis: Redis, project_uuid: str) -> Optional[int]:
+    """
+    Get the database id of a project from its uuid without querying Postgres.
+    """
+    project_id = await redis.get(_project_ref_key(project_uuid))
+    return int(project_id) if project_id is not None else None
+
+
+def get_token_subject(token: str) -> Optional[str]:
+    """
+    Get the username a bearer token was issued to, without querying Postgres.
+
+    Returns:
+        str: The username, or ``None`` when the token is invalid.
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except jwt.InvalidTokenError:
+        return None
+    return payload.get("sub")
+
+
+def _make_etag(subject: str, resource: str, version: str, variant: str) -> str:
+    message = "\n".join((subject, resource, version, variant)).encode()
+    return '"' + hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()[:32] + '"'
+
+
+def _not_modified(request: Request, etag: str, last_modified: float, authorized: bool) -> bool:
+    # Only an exact ETag proves on its own that the caller may read the
+    # resource (it is an HMAC issued after a successful build). "*" and
+    # If-Modified-Since would tell anyone whether a resource exists and when
+    # it last changed, so they need ``authorized``.
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+        return etag in candidates or ("*" in candidates and authorized)
+
+    if not authorized:
+        return False
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def cached_get(
+    request: Request,
+    redis: Redis,
+    token: str,
+    resource: Optional[str],
+    build: Callable[[], Awaitable[Response]],
+    settle_seconds: float = 0,
+) -> Response:
+    """
+    Serve a GET endpoint with ETag/Last-Modified and a short-TTL body cache.
+
+    The ETag is an HMAC over the token's user, the resource, its version and
+    the query string, so it is only ever issued to a user who was allowed
+    to read the resource. A matching If-None-Match gets a 304 and a cached
+    body is replayed, both without running ``build``; neither touches
+    Postgres or Mongo. ``If-None-Match: *`` and If-Modified-Since are only
+    answered with a 304 once the caller's access is known, from a cached
+    body or a successful ``build``. Call bump_resource_versions whenever the
+    resource changes.
+
+    Args:
+        request (Request): The request.
+        redis (Redis): The Redis client.
+        token (str): The bearer token of the request.
+        resource (str, optional): The resource the response is built from; ``None`` skips caching.
+        build (Callable[[], Awaitable[Response]]): Builds the full response.
+        settle_seconds (float): Skip caching while the resource changed less than this long ago.
+
+    Returns:
+        Response: A 304, the cached response, or the one from ``build``.
+    """
+    subject = get_token_subject(token)
+    if subject is None or resource is None:
+        return await build()
+
+    version = await get_resource_version(redis, resource)
+    etag = _make_etag(subject, resource, version, str(request.query_params))
+    last_modified = get_version_time(version)
+    if time.time() - last_modified < settle_seconds:
+        return await build()
+
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+
+    if _not_modified(request, etag, last_modified, authorized=False):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # A body is only cached under this user's ETag after build succeeded for them.
+    body = await redis.get(_body_key(etag))
+    if body is not None:
+        if _not_modified(request, etag, last_modified, authorized=True):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    response = await build()
+    if response.status_code == status.HTTP_200_OK:
+        await redis.set(_body_key(etag), response.body, ex=settings.HTTP_CACHE_TTL)
+        if _not_modified(request, etag, last_modified, authorized=True):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+    return response
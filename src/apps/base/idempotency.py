@@ -0,0 +1,115 @@
+import hashlib
+import json
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from redis.asyncio import Redis
+
+from src.config.settings import IDEMPOTENCY_TTL, IDEMPOTENCY_LOCK_TTL
+
+IDEMPOTENCY_KEY_PREFIX = "idempotency:"
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def _record_key(scope: str, idempotency_key: str) -> str:
+    return f"{IDEMPOTENCY_KEY_PREFIX}{_digest(scope)}:{_digest(idempotency_key)}"
+
+
+async def _claim(redis: Redis, record_key: str, fingerprint: str) -> Optional[JSONResponse]:
+    """
+    Claim an idempotency key, or get the response stored for it.
+
+    Returns:
+        JSONResponse: The stored response to replay, or ``None`` once the key is claimed.
+    """
+    in_progress = json.dumps({"state": "in_progress", "fingerprint": fingerprint})
+    if await redis.set(record_key, in_progress, nx=True, ex=IDEMPOTENCY_LOCK_TTL):
+        return None
+
+    stored = await redis.get(record_key)
+    if stored is None:
+        # The previous attempt was aborted in between; claim it again.
+        return await _claim(redis, record_key, fingerprint)
+
+    record = json.loads(stored)
+    if record["fingerprint"] != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request",
+        )
+    if record["state"] == "in_progress":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed",
+        )
+
+    return JSONResponse(
+        content=record["body"],
+        status_code=record["status_code"],
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+async def run_idempotent(
+    redis: Redis,
+    scope: str,
+    idempotency_key: Optional[str],
+    fingerprint: str,
+    process: Callable[[], Awaitable[JSONResponse]],
+) -> JSONResponse:
+    """
+    Run a request handler at most once per Idempotency-Key.
+
+    Successful responses are kept in Redis for IDEMPOTENCY_TTL and replayed
+    for retries with the same key without running the handler again. Failed
+    attempts release the key so the client can retry them.
+
+    Args:
+        redis (Redis): The Redis client.
+        scope (str): Who the key belongs to, e.g. the API key it was sent with.
+        idempotency_key (str, optional): The Idempotency-Key header; without it the handler just runs.
+        fingerprint (str): Identifies the request body; reusing a key for another body is rejected.
+        process (Callable[[], Awaitable[JSONResponse]]): The handler.
+
+    Returns:
+        JSONResponse: The handler's response, or the stored one.
+    """
+    if not idempotency_key:
+        return await process()
+
+    if len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be at most {MAX_IDEMPOTENCY_KEY_LENGTH} characters",
+        )
+
+    record_key = _record_key(scope, idempotency_key)
+    fingerprint = _digest(fingerprint)
+
+    replay = await _claim(redis, record_key, fingerprint)
+    if replay is not None:
+        return replay
+
+    try:
+        response = await process()
+    except BaseException:
+        await redis.delete(record_key)
+        raise
+
+    if 200 <= response.status_code < 300:
+        record = {
+            "state": "done",
+            "fingerprint": fingerprint,
+            "status_code": response.status_code,
+            "body": json.loads(response.body),
+        }
+        await redis.set(record_key, json.dumps(record), ex=IDEMPOTENCY_TTL)
+    else:
+        await redis.delete(record_key)
+
+    return response
@@ -0,0 +1,39 @@
+import base64
+import json
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(position: dict) -> str:
+    """
+    Encode a keyset position as an opaque, URL safe cursor.
+
+    Args:
+        position (dict): JSON serialisable values identifying a row.
+
+    Returns:
+        str: The cursor.
+    """
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decode a cursor made by encode_cursor.
+
+    Args:
+        cursor (str): The cursor.
+
+    Returns:
+        dict: The keyset position.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    if not isinstance(position, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return position
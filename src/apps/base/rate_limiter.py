@@ -0,0 +1,152 @@
+import math
+from typing import Dict, Tuple
+
+from fastapi import HTTPException, Request, status
+from redis.asyncio import Redis
+
+from src.config.settings import (
+    TRUSTED_PROXY_COUNT,
+    WAITLIST_API_KEY_RATE_LIMIT,
+    WAITLIST_RATE_LIMIT_OVERRIDES,
+)
+from src.config.db.redis_management.redis_manager import register_script
+
+RATE_LIMIT_KEY_PREFIX = "rate_limit:"
+
+RATE_PERIODS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 60 * 60,
+    "day": 60 * 60 * 24,
+}
+
+# Token bucket refilled continuously at capacity/period. Takes one token and
+# returns {allowed, retry_after_ms}. Time comes from the Redis server so every
+# worker sees the same clock.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local period_ms = tonumber(ARGV[2])
+local now = redis.call('TIME')
+now = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+local refill_rate = capacity / period_ms
+tokens = math.min(capacity, tokens + (now - ts) * refill_rate)
+
+local allowed = 0
+local retry_after_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after_ms = math.ceil((1 - tokens) / refill_rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], period_ms)
+return {allowed, retry_after_ms}
+"""
+
+_take_token = register_script(TOKEN_BUCKET_SCRIPT)
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """
+    Parse a rate such as ``20/minute``.
+
+    Args:
+        rate (str): The number of requests per second, minute, hour or day.
+
+    Returns:
+        Tuple[int, int]: The number of requests and the period in seconds.
+    """
+    count, _, period = rate.partition("/")
+    return int(count), RATE_PERIODS[period.strip().rstrip("s")]
+
+
+def parse_rate_overrides(entries) -> Dict[str, str]:
+    """
+    Parse ``name=rate`` entries into a mapping.
+
+    Args:
+        entries (List[str]): Entries such as ``12=100/minute``.
+
+    Returns:
+        Dict[str, str]: The rate for each name.
+    """
+    overrides = {}
+    for entry in entries:
+        name, _, rate = entry.partition("=")
+        parse_rate(rate)  # fail at startup on a malformed setting
+        overrides[name.strip()] = rate.strip()
+    return overrides
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    Get the address of the client, looking through the trusted proxies' header.
+
+    Only the last TRUSTED_PROXY_COUNT entries of X-Forwarded-For were added
+    by our proxies; the client can put anything before them, so the address
+    is taken that many entries from the right.
+    """
+    if TRUSTED_PROXY_COUNT > 0:
+        forwarded_for = [
+            entry.strip() for entry in request.headers.get("x-forwarded-for", "").split(",") if entry.strip()
+        ]
+        if forwarded_for:
+            # Fewer entries than proxies: the first one was added by the outermost proxy.
+            return forwarded_for[-min(TRUSTED_PROXY_COUNT, len(forwarded_for))]
+    return request.client.host if request.client else "unknown"
+
+
+async def hit_rate_limit(redis: Redis, bucket: str, rate: str) -> int:
+    """
+    Take one request from a bucket shared by every worker.
+
+    Args:
+        redis (Redis): The Redis client.
+        bucket (str): The bucket name, e.g. ``ip:1.2.3.4``.
+        rate (str): The rate allowed for the bucket, e.g. ``20/minute``.
+
+    Returns:
+        int: 0 when the request is allowed, otherwise the seconds to wait.
+    """
+    capacity, period = parse_rate(rate)
+    allowed, retry_after_ms = await _take_token(
+        keys=[RATE_LIMIT_KEY_PREFIX + bucket], args=[capacity, period * 1000], client=redis
+    )
+    return 0 if allowed else max(1, math.ceil(retry_after_ms / 1000))
+
+
+async def enforce_rate_limit(redis: Redis, bucket: str, rate: str):
+    """
+    Raise a 429 with Retry-After when a bucket is empty.
+
+    Args:
+        redis (Redis): The Redis client.
+        bucket (str): The bucket name.
+        rate (str): The rate allowed for the bucket.
+    """
+    retry_after = await hit_rate_limit(redis, bucket, rate)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+WAITLIST_RATE_OVERRIDES = parse_rate_overrides(WAITLIST_RATE_LIMIT_OVERRIDES)
+
+
+def get_api_key_rate(api_key_id: int, project_id: int) -> str:
+    """
+    Get the ingest rate of an API key: its own override, then its project's, then the default.
+    """
+    return WAITLIST_RATE_OVERRIDES.get(
+        f"api_key:{api_key_id}",
+        WAITLIST_RATE_OVERRIDES.get(f"project:{project_id}", WAITLIST_API_KEY_RATE_LIMIT),
+    )
@@ -1,7 +1,9 @@
 import json
 import os
+from functools import lru_cache
 
 import boto3
+from botocore.config import Config
 
 
 def get_s3_object(bucket, file_name):
@@ -48,9 +50,129 @@ def upload_data_to_s3(data, file_name, bucket, expiry=3600):
         str: The S3 link to the uploaded file.
     """
 
-    s3 = boto3.client("s3")
-    s3.put_object(Bucket=bucket, Key=file_name, Body=data)
-    url = s3.generate_presigned_url(
+    get_s3_client().put_object(Bucket=bucket, Key=file_name, Body=data)
+    return generate_download_url(bucket, file_name, expiry)
+
+
+@lru_cache(maxsize=None)
+def get_s3_client():
+    """
+    Get the S3 client shared by the whole process.
+
+    boto3 clients are thread safe and keep a pool of HTTP connections, so
+    creating one per upload only throws those connections away.
+    """
+    # settings imports this module, so read it when the client is first needed.
+    from src.config import settings
+
+    return boto3.client(
+        "s3",
+        endpoint_url=settings.S3_ENDPOINT_URL,
+        config=Config(
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            retries={"max_attempts": 5, "mode": "standard"},
+        ),
+    )
+
+
+def generate_download_url(bucket, file_name, expiry=3600):
+    """
+    Generate a presigned download URL for an S3 object.
+
+    Args:
+        bucket (str): The bucket name.
+        file_name (str): The object key.
+        expiry (int): The expiry time in seconds.
+
+    Returns:
+        str: The presigned URL.
+    """
+    return get_s3_client().generate_presigned_url(
         "get_object", Params={"Bucket": bucket, "Key": file_name}, ExpiresIn=expiry
     )
-    return url
\ No newline at end of file
+
+
+def delete_s3_objects(bucket, file_names):
+    """
+    Delete S3 objects, in requests of up to 1000 keys.
+
+    Keys that don't exist are ignored.
+
+    Args:
+        bucket (str): The bucket name.
+        file_names (List[str]): The object keys.
+    """
+    client = get_s3_client()
+    for offset in range(0, len(file_names), 1000):
+        client.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": file_name} for file_name in file_names[offset:offset + 1000]], "Quiet": True},
+        )
+
+
+class S3MultipartWriter:
+    """
+    Write an S3 object as a multipart upload through a fixed-size part buffer.
+
+    Data is buffered until a part is full and then uploaded, so at most one
+    part (plus the chunk that filled it) is held in memory whatever the size
+    of the object. Used as a context manager, the upload is completed on exit
+    or aborted if the block raised, so no orphaned parts are left behind.
+    The calls block on the network; run them in a thread from async code.
+    """
+
+    def __init__(self, bucket, file_name, content_type="application/octet-stream", part_size=None):
+        from src.config import settings
+
+        self.bucket = bucket
+        self.file_name = file_name
+        self.part_size = part_size or settings.S3_MULTIPART_PART_SIZE
+        self.bytes_written = 0
+        self._client = get_s3_client()
+        self._buffer = bytearray()
+        self._parts = []
+        self._upload_id = self._client.create_multipart_upload(
+            Bucket=bucket, Key=file_name, ContentType=content_type
+        )["UploadId"]
+
+    def write(self, data: bytes):
+        self._buffer += data
+        self.bytes_written += len(data)
+        if len(self._buffer) >= self.part_size:
+            self._upload_part()
+
+    def _upload_part(self):
+        part_number = len(self._parts) + 1
+        response = self._client.upload_part(
+            Bucket=self.bucket,
+            Key=self.file_name,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=bytes(self._buffer),
+        )
+        self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+        self._buffer = bytearray()
+
+    def complete(self):
+        # The last part may be smaller than 5 MiB, and an empty object is one empty part.
+        if self._buffer or not self._parts:
+            self._upload_part()
+        self._client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.file_name,
+            UploadId=self._upload_id,
+            MultipartUpload={"Parts": self._parts},
+        )
+
+    def abort(self):
+        self._client.abort_multipart_upload(Bucket=self.bucket, Key=self.file_name, UploadId=self._upload_id)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.complete()
+        else:
+            self.abort()
+        return False
\ No newline at end of file
@@ -43,4 +43,11 @@ class ResponseSchema(GenericModel, Generic[T]):
 class PaginatedResponseSchema(GenericModel, Generic[T]):
     message: str
     data: Optional[T]
-    total: int
\ No newline at end of file
+    total: int
+
+
+class CursorPaginatedResponseSchema(GenericModel, Generic[T]):
+    message: str
+    data: Optional[T]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
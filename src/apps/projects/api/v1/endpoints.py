@@ -1,16 +1,18 @@
-from uuid import uuid4
+import asyncio
 import json
-from fastapi import APIRouter, HTTPException, Request, Depends, status, BackgroundTasks
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from fastapi import APIRouter, HTTPException, Request, Depends, status, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from redis.asyncio import Redis
-from typing import Annotated, Optional, List
+from typing import Annotated, Optional, List, Literal
 
-from src.config.db.mongo_management.mongo_manager import project_waitlist_collection
-from src.config.db.postgres_management.pg_manager import get_db, engine
+from src.config.db.mongo_management.async_mongo_manager import async_project_waitlist_list_collection
+from src.config.db.postgres_management.pg_manager import get_async_db, engine
 from src.config.db.redis_management.redis_manager import get_redis
+from src.config.settings import WAITLIST_LIVE_HEARTBEAT_SECONDS, HTTP_CACHE_REPLICA_SETTLE_SECONDS
 from src.apps.projects.schemas.request_schema import ProjectSchema, CreateProjectSchema
-from src.apps.projects.schemas.response_schema import ProjectResponseSchema
+from src.apps.projects.schemas.response_schema import ProjectResponseSchema, ProjectSummarySchema
 from src.apps.projects.service import (
     get_project_by_name,
     get_project_by_id,
@@ -19,14 +21,16 @@ from src.apps.projects.service import (
     create_project,
     update_project,
     create_project_response_data,
+    create_project_summary_data,
     update_project_by_project_id,
-    download_waitlist,
+    get_export_media_type,
     EXTENSION_TYPES
 )
 from src.apps.base.schemas.reponse_types import (
     SuccessResponse,
     ResponseSchema,
     PaginatedResponseSchema,
+    CursorPaginatedResponseSchema,
     BadGatewayResponse,
     BadRequestResponse,
     InternalServerErrorResponse,
@@ -35,6 +39,34 @@ from src.apps.base.schemas.reponse_types import (
     TooManyRequestsReponse,
 )
 from src.apps.waitlist.schemas.waitlist_schema import WaitlistResponse
+from src.apps.waitlist.bloom import mark_bloom_filter_empty
+from src.apps.waitlist.service import (
+    get_project_waitlist_page,
+    render_waitlist_rows,
+    build_waitlist_search_filter,
+    WAITLIST_ROW_PROJECTION,
+)
+from src.apps.waitlist.counters import get_signup_count, get_signup_summaries
+from src.apps.waitlist.rollups import get_signup_series
+from src.apps.waitlist.live import signup_broker
+from src.apps.projects.exporters import (
+    stream_waitlist_export,
+    get_export_watermark,
+    decode_watermark,
+    get_export_file_suffix,
+    validate_export_options,
+)
+from src.apps.projects.export_jobs import enqueue_export_job, get_export_job, get_last_watermark, FAILED, DONE
+from src.apps.base.http_cache import (
+    cached_get,
+    bump_resource_versions,
+    get_project_ref,
+    get_token_subject,
+    remember_project_ref,
+    projects_resource,
+    project_resource,
+    waitlist_resource,
+)
 from src.apps.projects.models import Project
 from src.apps.auth.utils.password import oauth2_scheme
 from src.apps.auth.service import get_current_user
@@ -43,6 +75,13 @@ Project.__table__.create(bind=engine, checkfirst=True)
 
 router = APIRouter(prefix="/v1")
 
+DEFAULT_ANALYTICS_RANGES = {
+    "hour": timedelta(hours=48),
+    "day": timedelta(days=30),
+    "week": timedelta(weeks=12),
+}
+
+
 @router.get(
     "/projects",
     summary="Get all projects",
@@ -63,22 +102,68 @@ router = APIRouter(prefix="/v1")
     tags=["Projects"],
 )
 async def get_projects(
+    request: Request,
     token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    db: AsyncSession = Depends(get_async_db),
+):
+
+    async def build():
+        user = await get_current_user(db=db, token=token)
+        projects = await get_all_projects(db, user.id)
+
+        project_data = [create_project_response_data(project) for project in projects]
+
+        response = ResponseSchema[List[ProjectResponseSchema]](
+            data=project_data,
+            message="Projects retrieved successfully",
+        )
+
+        return JSONResponse(content=response.dict(), status_code=status.HTTP_200_OK)
+
+    return await cached_get(request, redis, token, projects_resource(get_token_subject(token)), build)
+
+
+@router.get(
+    "/projects/summary",
+    summary="Get account summary",
+    description="Every project with its signup total, last signup time and limit usage, in one call.",
+    responses={
+        200: {"description": "Successful response", "model": ResponseSchema[List[ProjectSummarySchema]]},
+        400: {"description": "Bad request", "model": BadRequestResponse},
+        429: {"description": "Too many requests", "model": TooManyRequestsReponse},
+        500: {
+            "description": "Internal Server Error",
+            "model": InternalServerErrorResponse,
+        },
+        502: {"description": "Bad Gateway", "model": BadGatewayResponse},
+        503: {
+            "description": "Service Unavailable",
+            "model": ServiceUnavailableResponse,
+        },
+    },
+    tags=["Projects"],
+)
+async def get_projects_summary(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    redis: Redis = Depends(get_redis),
+    db: AsyncSession = Depends(get_async_db),
 ):
 
     user = await get_current_user(db=db, token=token)
-    projects = get_all_projects(db, user.id)
+    projects = await get_all_projects(db, user.id)
 
-    project_data = [create_project_response_data(project) for project in projects]
+    summaries = await get_signup_summaries(redis, [project.id for project in projects])
+    summary_data = [create_project_summary_data(project, *summaries[project.id]) for project in projects]
 
-    response = ResponseSchema[List[ProjectResponseSchema]](
-        data=project_data,
-        message="Projects retrieved successfully",
+    response = ResponseSchema[List[ProjectSummarySchema]](
+        data=summary_data,
+        message="Account summary retrieved successfully",
     )
 
     return JSONResponse(content=response.dict(), status_code=status.HTTP_200_OK)
 
+
 @router.post(
     "/create",
     summary="Create a project",
@@ -102,14 +187,17 @@ async def create_project_endpoint(
     request: Request,
     token: Annotated[str, Depends(oauth2_scheme)],
     project: CreateProjectSchema,
-    db: Session = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    db: AsyncSession = Depends(get_async_db),
 ):
 
     user = await get_current_user(db=db, token=token)
 
     project.limit = 50  # TODO: create a logic based on subscription
 
-    created_project = create_project(db, project, user.id)
+    created_project = await create_project(db, project, user.id)
+    await mark_bloom_filter_empty(redis, created_project.id)
+    await bump_resource_versions(redis, projects_resource(user.username))
     project_response_data = create_project_response_data(created_project)
 
     response = ResponseSchema[ProjectResponseSchema](
@@ -139,25 +227,30 @@ async def create_project_endpoint(
     tags=["Projects"],
 )
 async def get_project_details(
+    request: Request,
     project_id: str,
     token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    db: AsyncSession = Depends(get_async_db),
 ):
 
-    user = await get_current_user(db=db, token=token)
+    async def build():
+        user = await get_current_user(db=db, token=token)
 
-    project = get_project_by_project_id(db, project_id, user.id)
+        project = await get_project_by_project_id(db, project_id, user.id)
 
-    if project is None:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project not found")
+        if project is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project not found")
 
-    project_response_data = create_project_response_data(project)
+        project_response_data = create_project_response_data(project)
 
-    response = ResponseSchema[ProjectResponseSchema](
-        data=project_response_data,
-        message="Project retrieved successfully",
-    )
-    return JSONResponse(content=response.dict(), status_code=status.HTTP_200_OK)
+        response = ResponseSchema[ProjectResponseSchema](
+            data=project_response_data,
+            message="Project retrieved successfully",
+        )
+        return JSONResponse(content=response.dict(), status_code=status.HTTP_200_OK)
+
+    return await cached_get(request, redis, token, project_resource(project_id), build)
 
 
 @router.patch(
@@ -184,17 +277,19 @@ async def update_project_endpoint(
     project_id: str, 
     token: Annotated[str, Depends(oauth2_scheme)],
     project: ProjectSchema,
-    db: Session = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    db: AsyncSession = Depends(get_async_db),
 ):
 
     user = await get_current_user(db=db, token=token)
 
-    existing_project = get_project_by_project_id(db, project_id, user.id)
+    existing_project = await get_project_by_project_id(db, project_id, user.id)
 
     if existing_project is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project not found")
 
-    updated_project = update_project_by_project_id(db, existing_project, project)
+    updated_project = await update_project_by_project_id(db, existing_project, project)
+    await bump_resource_versions(redis, projects_resource(user.username), project_resource(project_id))
     
     project_response_data = create_project_response_data(updated_project)
 
@@ -210,7 +305,10 @@ async def update_project_endpoint(
     "/{project_id}/waitlist/list",
     summary="Get Waitlist",
     responses={
-        200: {"description": "Successful response", "model": PaginatedResponseSchema[List[WaitlistResponse]]},
+        200: {
+            "description": "Successful response; CursorPaginatedResponseSchema when `cursor` is given",
+            "model": PaginatedResponseSchema[List[WaitlistResponse]],
+        },
         400: {"description": "Bad request", "model": BadRequestResponse},
         429: {"description": "Too many requests", "model": TooManyRequestsReponse},
         500: {
@@ -229,32 +327,291 @@ async def get_waitlist_ids(
         project_id: str,
         request: Request,
         token: Annotated[str, Depends(oauth2_scheme)],
-        db: Session = Depends(get_db),
+        redis: Redis = Depends(get_redis),
+        db: AsyncSession = Depends(get_async_db),
 ) -> JSONResponse:
 
+    async def build():
+        user = await get_current_user(db=db, token=token)
+        existing_project = await get_project_by_project_id(db, project_id, user.id)
+
+        if existing_project is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project not found")
+        await remember_project_ref(redis, project_id, existing_project.id)
+
+        page_size = max(1, int(request.query_params.get("size", 10)))
+
+        if "cursor" in request.query_params:
+            # Keyset mode: pass an empty cursor for the first page, then next_cursor/prev_cursor.
+            documents, next_cursor, prev_cursor = await get_project_waitlist_page(
+                existing_project.id, page_size, request.query_params.get("cursor") or None
+            )
+            content = render_waitlist_rows(
+                "Waitlist retrieved successfully", documents, next_cursor=next_cursor, prev_cursor=prev_cursor
+            )
+            return Response(content=content, media_type="application/json", status_code=status.HTTP_200_OK)
+
+        page = int(request.query_params.get("page", 1))
+        skip = (page - 1) * page_size
+        documents = await (
+            async_project_waitlist_list_collection.find({"project_id": existing_project.id}, WAITLIST_ROW_PROJECTION)
+            .skip(skip)
+            .limit(page_size)
+            .to_list(page_size)
+        )
+        # Served from the maintained counter; exact=true counts in Mongo and resyncs it.
+        exact = request.query_params.get("exact", "false").lower() == "true"
+        total_count = await get_signup_count(redis, existing_project.id, exact=exact)
+
+        content = render_waitlist_rows("Waitlist retrieved successfully", documents, total=total_count)
+        return Response(content=content, media_type="application/json", status_code=status.HTTP_200_OK)
+
+    # Signups bump the waitlist version by database id; the uuid -> id ref is
+    # learned from the first full response. exact=true always recounts.
+    project_ref = await get_project_ref(redis, project_id)
+    resource = None
+    if project_ref is not None and request.query_params.get("exact", "false").lower() != "true":
+        resource = waitlist_resource(project_ref)
+    return await cached_get(request, redis, token, resource, build, settle_seconds=HTTP_CACHE_REPLICA_SETTLE_SECONDS)
+
+
+@router.get(
+    "/{project_id}/waitlist/live",
+    summary="Live Waitlist Feed",
+    description=(
+        "Server-Sent Events stream of accepted signups. Each `signup` event carries a JSON batch "
+        "`{project_id, signups: [{email, date_added}]}`; comment lines are sent as heartbeats."
+    ),
+    responses={
+        200: {"description": "Event stream", "content": {"text/event-stream": {}}},
+        400: {"description": "Bad request", "model": BadRequestResponse},
+        429: {"description": "Too many requests", "model": TooManyRequestsReponse},
+        500: {
+            "description": "Internal Server Error",
+            "model": InternalServerErrorResponse,
+        },
+        502: {"description": "Bad Gateway", "model": BadGatewayResponse},
+        503: {
+            "description": "Service Unavailable",
+            "model": ServiceUnavailableResponse,
+        },
+    },
+    tags=["Waitlist"],
+)
+async def get_waitlist_live(
+        project_id: str,
+        request: Request,
+        token: Annotated[str, Depends(oauth2_scheme)],
+        redis: Redis = Depends(get_redis),
+        db: AsyncSession = Depends(get_async_db),
+) -> StreamingResponse:
+
     user = await get_current_user(db=db, token=token)
-    existing_project = get_project_by_project_id(db, project_id, user.id)
-    page = int(request.query_params.get("page", 1))
-    page_size = int(request.query_params.get("size", 10))
-    skip = (page - 1) * page_size
-    waitlist_cursor = project_waitlist_collection.find({"project_id": existing_project.id}).skip(skip).limit(page_size)
-    total_count = project_waitlist_collection.count_documents({"project_id": existing_project.id})
-
-    waitlist_data = []
-    for waitlist_item in waitlist_cursor:
-        waitlist_item['_id'] = str(waitlist_item['_id'])  # Convert ObjectId to string
-        waitlist_item['date_added'] = waitlist_item['date_added'].isoformat()
-        waitlist_data.append(WaitlistResponse(**waitlist_item))
-
-    response = PaginatedResponseSchema[List[WaitlistResponse]](
-        data=waitlist_data,
-        message="Waitlist retrieved successfully",
-        total=total_count
+    existing_project = await get_project_by_project_id(db, project_id, user.id)
+
+    if existing_project is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project not found")
+
+    # The stream can stay open for hours; don't hold a pooled Postgres connection for it.
+    await db.close()
+
+    queue = await signup_broker.subscribe(redis, existing_project.id)
+
+    async def events():
+        try:
+            yield f"retry: {WAITLIST_LIVE_HEARTBEAT_SECONDS * 1000}\n\n"
+            while True:
+                try:
+                    data = await asyncio.wait_for(queue.get(), timeout=WAITLIST_LIVE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"event: signup\ndata: {data}\n\n"
+        finally:
+            await signup_broker.unsubscribe(existing_project.id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
+
+@router.get(
+    "/{project_id}/waitlist/search",
+    summary="Search Waitlist",
+    description="Find signups by email prefix or substring and/or `date_added` range, paged with cursors.",
+    responses={
+        200: {"description": "Successful response", "model": CursorPaginatedResponseSchema[List[WaitlistResponse]]},
+        400: {"description": "Bad request", "model": BadRequestResponse},
+        429: {"description": "Too many requests", "model": TooManyRequestsReponse},
+        500: {
+            "description": "Internal Server Error",
+            "model": InternalServerErrorResponse,
+        },
+        502: {"description": "Bad Gateway", "model": BadGatewayResponse},
+        503: {
+            "description": "Service Unavailable",
+            "model": ServiceUnavailableResponse,
+        },
+    },
+    tags=["Waitlist"],
+)
+async def search_waitlist(
+        project_id: str,
+        token: Annotated[str, Depends(oauth2_scheme)],
+        q: Optional[str] = Query(None, description="Text to look for in the email (case insensitive)"),
+        match: Literal["prefix", "substring"] = Query("prefix"),
+        date_from: Optional[datetime] = Query(None, description="Signups at or after this time"),
+        date_to: Optional[datetime] = Query(None, description="Signups before this time"),
+        size: int = Query(10, ge=1, le=500),
+        cursor: Optional[str] = Query(None, description="next_cursor/prev_cursor of a previous page"),
+        db: AsyncSession = Depends(get_async_db),
+) -> Response:
+
+    user = await get_current_user(db=db, token=token)
+    existing_project = await get_project_by_project_id(db, project_id, user.id)
+
+    if existing_project is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project not found")
+
+    filters = build_waitlist_search_filter(q, match, date_from, date_to)
+    documents, next_cursor, prev_cursor = await get_project_waitlist_page(existing_project.id, size, cursor, filters)
+
+    content = render_waitlist_rows(
+        "Waitlist search results retrieved successfully", documents, next_cursor=next_cursor, prev_cursor=prev_cursor
+    )
+    return Response(content=content, media_type="application/json", status_code=status.HTTP_200_OK)
+
+
+@router.get(
+    "/{project_id}/waitlist/analytics",
+    summary="Waitlist Analytics",
+    description="Signups per hour, day or week (starting Monday) between `start` and `end`, served from rollups.",
+    responses={
+        200: {"description": "Successful response", "model": ResponseSchema[dict]},
+        400: {"description": "Bad request", "model": BadRequestResponse},
+        429: {"description": "Too many requests", "model": TooManyRequestsReponse},
+        500: {
+            "description": "Internal Server Error",
+            "model": InternalServerErrorResponse,
+        },
+        502: {"description": "Bad Gateway", "model": BadGatewayResponse},
+        503: {
+            "description": "Service Unavailable",
+            "model": ServiceUnavailableResponse,
+        },
+    },
+    tags=["Waitlist"],
+)
+async def get_waitlist_analytics(
+        project_id: str,
+        token: Annotated[str, Depends(oauth2_scheme)],
+        interval: Literal["hour", "day", "week"] = Query("day"),
+        start: Optional[datetime] = Query(None, description="Defaults to 48 hours, 30 days or 12 weeks before end"),
+        end: Optional[datetime] = Query(None, description="Defaults to now"),
+        redis: Redis = Depends(get_redis),
+        db: AsyncSession = Depends(get_async_db),
+) -> JSONResponse:
+
+    user = await get_current_user(db=db, token=token)
+    existing_project = await get_project_by_project_id(db, project_id, user.id)
+
+    if existing_project is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project not found")
+
+    end = end or datetime.now()
+    try:
+        start = start or end - DEFAULT_ANALYTICS_RANGES[interval]
+    except OverflowError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end is out of range")
+    series = await get_signup_series(redis, existing_project.id, interval, start, end)
+
+    response = ResponseSchema(
+        data={"interval": interval, "buckets": series},
+        message="Waitlist analytics retrieved successfully",
+    )
     return JSONResponse(content=response.dict(), status_code=status.HTTP_200_OK)
 
 
+@router.get(
+    "/{project_uuid}/waitlist/export",
+    summary="Export Waitlist",
+    description=(
+        "Stream the waitlist as CSV, JSON, JSONL, XML or Parquet (`ext_type`), optionally gzip/zstd "
+        "compressed, encoded as it is read. Delta (`since`) and `resumable` exports stop at signups a few "
+        "minutes old and return that point in `X-Export-Watermark`; pass it as `since` to get only the "
+        "signups added after it."
+    ),
+    responses={
+        200: {
+            "description": "The file",
+            "content": {
+                media_type: {}
+                for media_type in [*EXTENSION_TYPES.values(), "application/gzip", "application/zstd"]
+            },
+        },
+        400: {"description": "Bad request", "model": BadRequestResponse},
+        429: {"description": "Too many requests", "model": TooManyRequestsReponse},
+        500: {
+            "description": "Internal Server Error",
+            "model": InternalServerErrorResponse,
+        },
+        502: {"description": "Bad Gateway", "model": BadGatewayResponse},
+        503: {
+            "description": "Service Unavailable",
+            "model": ServiceUnavailableResponse,
+        },
+    },
+    tags=["Waitlist"],
+)
+async def export_waitlist(
+    project_uuid: str,
+    token: Annotated[str, Depends(oauth2_scheme)],
+    ext_type: str = Query("csv", description="csv, json, jsonl, xml or parquet"),
+    compression: Optional[Literal["gzip", "zstd"]] = Query(None, description="Compress a text format"),
+    pretty: bool = Query(False, description="Indent JSON objects"),
+    since: Optional[str] = Query(
+        None, description="Only signups after this watermark, from X-Export-Watermark or a manifest"
+    ),
+    resumable: bool = Query(
+        False, description="End at a watermark returned in X-Export-Watermark, to continue from with `since`"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+) -> StreamingResponse:
+
+    user = await get_current_user(db=db, token=token)
+    validate_export_options(ext_type, compression)
+
+    existing_project = await get_project_by_project_id(db, project_uuid, user.id)
+    if existing_project is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project not found")
+
+    # Don't hold a pooled Postgres connection while the file streams.
+    await db.close()
+
+    file_suffix = get_export_file_suffix(ext_type, compression)
+    headers = {"Content-Disposition": f'attachment; filename="{project_uuid}-waitlist.{file_suffix}"'}
+    if since:
+        decode_watermark(since)
+    # Deltas, and full exports meant to be continued, stop a settle window
+    # short of now so the next delta neither skips nor repeats rows.
+    until = None
+    if since or resumable:
+        until = await get_export_watermark(existing_project.id, since)
+        headers["X-Export-Watermark"] = until
+
+    return StreamingResponse(
+        stream_waitlist_export(
+            existing_project.id, ext_type, since=since, until=until, compression=compression, pretty=pretty
+        ),
+        media_type=get_export_media_type(ext_type, compression),
+        headers=headers,
+    )
+
+
 @router.get(
     "/{project_uuid}/waitlist/download",
     summary="Download Waitlist",
@@ -278,35 +635,51 @@ async def download_waitlist_ids(
     project_uuid: str,
     request: Request,
     token: Annotated[str, Depends(oauth2_scheme)],
-    background_task : BackgroundTasks,
     redis: Redis = Depends(get_redis),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> JSONResponse:
     
     user = await get_current_user(db=db, token=token)
     extension_type = request.query_params.get("ext_type", "csv")
-    if extension_type not in EXTENSION_TYPES:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid extension type")
-
-    existing_project = get_project_by_project_id(db, project_uuid, user.id)
-    waitlist_cursor = project_waitlist_collection.find({"project_id": existing_project.id})
-
-    waitlist_data = []
-    for waitlist_item in waitlist_cursor:
-        waitlist_item['date_added'] = waitlist_item['date_added'].isoformat()
-        waitlist_item.pop("_id")
-        waitlist_item.pop("project_id")
-        waitlist_data.append(WaitlistResponse(**waitlist_item))
-    download_id = str(uuid4())
-    
-    background_task.add_task(download_waitlist, waitlist_data, extension_type, user.id, project_uuid, download_id)
+    compression = request.query_params.get("compression") or None
+    pretty = request.query_params.get("pretty", "false").lower() == "true"
+    resumable = request.query_params.get("resumable", "false").lower() == "true"
+    validate_export_options(extension_type, compression)
+
+    existing_project = await get_project_by_project_id(db, project_uuid, user.id)
+    if existing_project is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project not found")
+
+    # Runs in the export worker process (Procfile "worker").
+    # since: the watermark from a previous manifest, or "last" for the one of
+    # this user's last export in this format, to get only the signups added after it.
+    # resumable: end a full export at a watermark, in its manifest, to continue from.
+    since = request.query_params.get("since")
+    if since == "last":
+        resumable = True
+        since = await get_last_watermark(redis, existing_project.id, user.id, extension_type)
+    elif since:
+        decode_watermark(since)
+
+    total_rows = None if since else await get_signup_count(redis, existing_project.id)
+    download_id = await enqueue_export_job(
+        redis,
+        existing_project.id,
+        project_uuid,
+        user.id,
+        extension_type,
+        total_rows=total_rows,
+        since=since,
+        compression=compression,
+        pretty=pretty,
+        resumable=resumable,
+    )
 
-    await redis.set(download_id, "processing", ex=3600)
     return JSONResponse(
         content={
             "message": "Waitlist download initiated successfully!",
             "data": {"download_id": download_id}
-            },
+        },
         status_code=status.HTTP_200_OK
     )
     
@@ -336,26 +709,51 @@ async def download_waitlist_file(
     download_id: str,
     token: Annotated[str, Depends(oauth2_scheme)],
     redis: Redis = Depends(get_redis),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> JSONResponse:
     
     user = await get_current_user(db=db, token=token)
-    download_data = await redis.get(download_id)
+    job = await get_export_job(redis, download_id)
     
-    if not download_data:
+    if not job or job["user_id"] != str(user.id) or job["project_uuid"] != project_uuid:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown Download ID. Retry after sometime!")
-    elif download_data == "processing":
+
+    progress = {
+        "state": job["state"],
+        "rows_processed": int(job["rows_processed"]),
+        "total_rows": int(job["total_rows"]) if "total_rows" in job else None,
+        "attempts": int(job["attempts"]),
+    }
+
+    if job["state"] == FAILED:
+        # A known outcome of the job, not a fault of this request.
+        return JSONResponse(
+            content={
+                "message": "Waitlist download failed. Start a new download.",
+                "data": progress,
+            },
+            status_code=status.HTTP_200_OK
+        )
+    elif job["state"] != DONE:
         return JSONResponse(
             content={
                 "message": "Waitlist download is in progress.",
-                },
+                "data": progress,
+            },
             status_code=status.HTTP_202_ACCEPTED
         )
 
     return JSONResponse(
         content={
             "message": "Waitlist download initiated successfully!",
-            "data": {"download_url": str(download_data)}
-            },
+            "data": {
+                "download_url": job["download_url"],
+                "manifest_url": job.get("manifest_url"),
+                "since": job.get("since"),
+                "watermark": job.get("watermark"),
+                "cached": bool(job.get("cached")),
+                **progress,
+            }
+        },
         status_code=status.HTTP_200_OK
     )
\ No newline at end of file
@@ -0,0 +1,510 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Dict, Optional
+from uuid import uuid4
+
+from redis.asyncio import Redis
+
+from src.config.settings import (
+    BUCKET_NAME,
+    EXPORT_CACHE_TTL,
+    EXPORT_FILE_RETENTION_SECONDS,
+    EXPORT_JOB_MAX_ATTEMPTS,
+    EXPORT_JOB_RETRY_BACKOFF_SECONDS,
+    EXPORT_JOB_STALE_SECONDS,
+    EXPORT_JOB_TTL,
+    MONGO_EXPORT_READ_PREFERENCE,
+    MONGO_MAX_STALENESS_SECONDS,
+    WAITLIST_EXPORT_SETTLE_SECONDS,
+)
+from src.config.db.redis_management.redis_manager import register_script
+from src.apps.base.http_cache import get_resource_version, get_version_time, waitlist_resource
+from src.apps.base.s3_helpers import delete_s3_objects, generate_download_url
+from src.apps.projects.service import download_waitlist, get_export_file_name, get_export_manifest_name
+from src.apps.projects.exporters import decode_watermark, get_export_watermark
+
+logger = logging.getLogger(__name__)
+
+EXPORT_JOB_PREFIX = "export:job:"
+EXPORT_QUEUE_KEY = "export:queue"
+EXPORT_PROCESSING_KEY = "export:processing"
+EXPORT_DELAYED_KEY = "export:delayed"
+EXPORT_WATERMARK_PREFIX = "export:watermark:"
+EXPORT_CACHE_PREFIX = "export:cache:"
+EXPORT_INFLIGHT_PREFIX = "export:inflight:"
+# Export files with a name per export, scored by when they were written.
+EXPORT_FILES_KEY = "export:files"
+
+# Claims the in-flight slot of an export for ARGV[1] when it is free or still
+# held by ARGV[2], a job known to have failed or expired; returns the holder.
+CLAIM_INFLIGHT_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current or current == ARGV[2] then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+    return ARGV[1]
+end
+return current
+"""
+
+# Stores watermark ARGV[2] unless the stored one is at a later position;
+# positions (ARGV[1]) compare as strings.
+ADVANCE_WATERMARK_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'position')
+if not current or ARGV[1] > current then
+    redis.call('HSET', KEYS[1], 'position', ARGV[1], 'watermark', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+RELEASE_INFLIGHT_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+QUEUED = "queued"
+RUNNING = "running"
+FAILED = "failed"
+DONE = "done"
+
+_claim_inflight_script = register_script(CLAIM_INFLIGHT_SCRIPT)
+_advance_watermark_script = register_script(ADVANCE_WATERMARK_SCRIPT)
+_release_inflight_script = register_script(RELEASE_INFLIGHT_SCRIPT)
+
+
+def _job_key(job_id: str) -> str:
+    return f"{EXPORT_JOB_PREFIX}{job_id}"
+
+
+def _watermark_key(project_id: int, user_id: int, extension_type: str) -> str:
+    return f"{EXPORT_WATERMARK_PREFIX}{project_id}:{user_id}:{extension_type}"
+
+
+def _watermark_position(watermark: str) -> str:
+    # Fixed width, so later positions sort after earlier ones as strings.
+    date_added, document_id = decode_watermark(watermark)
+    return f"{date_added.strftime('%Y-%m-%dT%H:%M:%S.%f')}|{document_id}"
+
+
+def _cache_key(project_id: int, export_key: str) -> str:
+    return f"{EXPORT_CACHE_PREFIX}{project_id}:{export_key}"
+
+
+def _inflight_key(project_id: int, export_key: str) -> str:
+    return f"{EXPORT_INFLIGHT_PREFIX}{project_id}:{export_key}"
+
+
+def get_export_key(
+    data_version: str,
+    extension_type: str,
+    since: Optional[str] = None,
+    compression: Optional[str] = None,
+    pretty: bool = False,
+    resumable: bool = False,
+) -> str:
+    """
+    Identify an export by its options and the waitlist version it is taken from.
+
+    Two requests with the same key produce the same file, so the second one
+    can reuse the first one's job or its S3 object.
+
+    Args:
+        data_version (str): The version of the project's waitlist resource.
+        extension_type (str): The file extension type.
+        since (str, optional): The watermark a delta export starts after.
+        compression (str, optional): gzip or zstd, for the text formats.
+        pretty (bool): Indent JSON objects.
+        resumable (bool): End a full export at a watermark.
+
+    Returns:
+        str: A short hex digest.
+    """
+    options = "\n".join((
+        data_version,
+        extension_type,
+        since or "",
+        compression or "",
+        "pretty" if pretty else "",
+        "resumable" if resumable and not since else "",
+    ))
+    return hashlib.sha256(options.encode()).hexdigest()[:24]
+
+
+async def get_last_watermark(redis: Redis, project_id: int, user_id: int, extension_type: str) -> Optional[str]:
+    """
+    Get the watermark of a user's last successful export of a project in a format.
+
+    Kept per user and format so an export run by someone else, or for
+    another consumer, doesn't move the ``since=last`` of a delta feed.
+    """
+    return await redis.hget(_watermark_key(project_id, user_id, extension_type), "watermark")
+
+
+async def _advance_watermark(redis: Redis, project_id: int, user_id: int, extension_type: str, watermark: str):
+    # Only ever moves forward, so an older job finishing last can't rewind it.
+    await _advance_watermark_script(
+        keys=[_watermark_key(project_id, user_id, extension_type)],
+        args=[_watermark_position(watermark), watermark],
+        client=redis,
+    )
+
+
+async def enqueue_export_job(
+    redis: Redis,
+    project_id: int,
+    project_uuid: str,
+    user_id: int,
+    extension_type: str,
+    total_rows: Optional[int] = None,
+    since: Optional[str] = None,
+    compression: Optional[str] = None,
+    pretty: bool = False,
+    resumable: bool = False,
+) -> str:
+    """
+    Queue a waitlist export for the worker process.
+
+    While the waitlist hasn't changed since an identical export finished,
+    no job is run: the new job is created done, with fresh links to that
+    export's files. An identical export that is still queued or running is
+    joined instead of starting another one.
+
+    Args:
+        redis (Redis): The Redis client.
+        project_id (int): The id of the project.
+        project_uuid (str): The project UUID.
+        user_id (int): The user the export belongs to.
+        extension_type (str): The file extension type.
+        total_rows (int, optional): The expected number of rows, for progress reporting.
+        since (str, optional): Make it a delta export of the signups after this watermark.
+        compression (str, optional): gzip or zstd, for the text formats.
+        pretty (bool): Indent JSON objects.
+        resumable (bool): End a full export at a watermark that later deltas can start from.
+
+    Returns:
+        str: The id of the job.
+    """
+    data_version = await get_resource_version(redis, waitlist_resource(project_id))
+    export_key = get_export_key(data_version, extension_type, since, compression, pretty, resumable)
+
+    job_id = str(uuid4())
+    now = time.time()
+    cached = await redis.hgetall(_cache_key(project_id, export_key))
+    if cached:
+        file_name = cached["file_name"]
+        rows = int(cached["rows"])
+        job = {
+            "id": job_id,
+            "project_id": project_id,
+            "project_uuid": project_uuid,
+            "user_id": user_id,
+            "extension_type": extension_type,
+            "state": DONE,
+            "rows_processed": rows,
+            "total_rows": rows,
+            "attempts": 0,
+            "cached": 1,
+            "download_url": generate_download_url(BUCKET_NAME, file_name, expiry=3600),
+            "manifest_url": generate_download_url(BUCKET_NAME, get_export_manifest_name(file_name), expiry=3600),
+            "created_at": now,
+            "updated_at": now,
+        }
+        if since:
+            job["since"] = since
+        if cached.get("watermark"):
+            job["watermark"] = cached["watermark"]
+            await _advance_watermark(redis, project_id, user_id, extension_type, cached["watermark"])
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(_job_key(job_id), mapping=job)
+            pipe.expire(_job_key(job_id), EXPORT_JOB_TTL)
+            await pipe.execute()
+        return job_id
+
+    stale = ""
+    while True:
+        holder = await _claim_inflight_script(
+            keys=[_inflight_key(project_id, export_key)], args=[job_id, stale, EXPORT_JOB_TTL], client=redis
+        )
+        if holder == job_id:
+            break
+        running = await get_export_job(redis, holder)
+        if running is not None and running["state"] != FAILED:
+            return holder
+        stale = holder
+
+    job = {
+        "id": job_id,
+        "project_id": project_id,
+        "project_uuid": project_uuid,
+        "user_id": user_id,
+        "extension_type": extension_type,
+        "state": QUEUED,
+        "rows_processed": 0,
+        "attempts": 0,
+        "export_key": export_key,
+        "data_version": data_version,
+        "created_at": now,
+        "updated_at": now,
+    }
+    if total_rows is not None:
+        job["total_rows"] = total_rows
+    if since:
+        job["since"] = since
+    if compression:
+        job["compression"] = compression
+    if pretty:
+        job["pretty"] = 1
+    if resumable:
+        job["resumable"] = 1
+
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(_job_key(job_id), mapping=job)
+        pipe.expire(_job_key(job_id), EXPORT_JOB_TTL)
+        pipe.lpush(EXPORT_QUEUE_KEY, job_id)
+        await pipe.execute()
+    return job_id
+
+
+async def get_export_job(redis: Redis, job_id: str) -> Optional[Dict[str, str]]:
+    """
+    Get the record of an export job.
+
+    Returns:
+        Dict[str, str]: The job fields, or ``None`` for an unknown (or expired) job.
+    """
+    job = await redis.hgetall(_job_key(job_id))
+    return job or None
+
+
+async def _update_job(redis: Redis, job_id: str, **fields):
+    fields["updated_at"] = time.time()
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(_job_key(job_id), mapping=fields)
+        if fields.get("state") == QUEUED:
+            # Stamped again by the worker that next takes it off the queue.
+            pipe.hdel(_job_key(job_id), "claimed_at")
+        await pipe.execute()
+
+
+async def _release_inflight(redis: Redis, job_id: str):
+    job = await get_export_job(redis, job_id)
+    if job is not None and "export_key" in job:
+        await _release_inflight_script(
+            keys=[_inflight_key(int(job["project_id"]), job["export_key"])], args=[job_id], client=redis
+        )
+
+
+async def _retry_or_fail(redis: Redis, job_id: str, attempts: int, error: str):
+    if attempts >= EXPORT_JOB_MAX_ATTEMPTS:
+        await _update_job(redis, job_id, state=FAILED, error=error)
+        await _release_inflight(redis, job_id)
+        logger.error("Export job %s failed after %s attempts: %s", job_id, attempts, error)
+        return
+
+    # Exponential backoff: 1x, 2x, 4x ... the base delay.
+    retry_at = time.time() + EXPORT_JOB_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+    await _update_job(redis, job_id, state=QUEUED, error=error, retry_at=retry_at)
+    await redis.zadd(EXPORT_DELAYED_KEY, {job_id: retry_at})
+
+
+async def promote_due_jobs(redis: Redis):
+    """
+    Move jobs whose retry delay is over back onto the queue.
+    """
+    for job_id in await redis.zrangebyscore(EXPORT_DELAYED_KEY, "-inf", time.time()):
+        # Only the worker that removes the entry queues it.
+        if await redis.zrem(EXPORT_DELAYED_KEY, job_id):
+            await redis.lpush(EXPORT_QUEUE_KEY, job_id)
+
+
+async def requeue_stale_jobs(redis: Redis):
+    """
+    Retry running jobs whose worker stopped reporting progress, e.g. after a restart.
+
+    A job that was claimed but never started is retried once it has been
+    claimed for EXPORT_JOB_STALE_SECONDS, so a job another worker has only
+    just taken off the queue is left alone.
+    """
+    now = time.time()
+    for job_id in await redis.lrange(EXPORT_PROCESSING_KEY, 0, -1):
+        job = await get_export_job(redis, job_id)
+        if job is None:
+            await redis.lrem(EXPORT_PROCESSING_KEY, 0, job_id)
+            continue
+        if job["state"] in (DONE, FAILED):
+            # Its worker is about to take it off the list, or died just before.
+            if now - float(job["updated_at"]) >= EXPORT_JOB_STALE_SECONDS:
+                await redis.lrem(EXPORT_PROCESSING_KEY, 0, job_id)
+            continue
+        if job["state"] == QUEUED:
+            claimed_at = job.get("claimed_at")
+            if claimed_at is None:
+                # Just moved here and not loaded by its worker yet, or that
+                # worker died first; either way the grace period starts now.
+                await redis.hsetnx(_job_key(job_id), "claimed_at", now)
+                continue
+            if now - float(claimed_at) < EXPORT_JOB_STALE_SECONDS:
+                continue
+        elif now - float(job["updated_at"]) < EXPORT_JOB_STALE_SECONDS:
+            continue
+        # Only the worker that removes the entry retries it.
+        if await redis.lrem(EXPORT_PROCESSING_KEY, 0, job_id):
+            logger.warning("Export job %s stalled, retrying", job_id)
+            await _retry_or_fail(redis, job_id, int(job["attempts"]), "The export worker stopped")
+
+
+async def delete_expired_export_files(redis: Redis, limit: int = 500):
+    """
+    Delete export files from S3 once nothing can point at them any more.
+
+    Files named per export are recorded when their job finishes and deleted
+    EXPORT_FILE_RETENTION_SECONDS later, with their manifests, after any
+    cache entry or download link for them has expired.
+
+    Args:
+        redis (Redis): The Redis client.
+        limit (int): The most files to delete in one call.
+    """
+    cutoff = time.time() - EXPORT_FILE_RETENTION_SECONDS
+    file_names = await redis.zrangebyscore(EXPORT_FILES_KEY, "-inf", cutoff, start=0, num=limit)
+    if not file_names:
+        return
+
+    objects = file_names + [get_export_manifest_name(file_name) for file_name in file_names]
+    await asyncio.to_thread(delete_s3_objects, BUCKET_NAME, objects)
+    await redis.zrem(EXPORT_FILES_KEY, *file_names)
+    logger.info("Deleted %s expired export files", len(file_names))
+
+
+def _is_settled(data_version: str) -> bool:
+    """
+    Tell whether an export of this data version can stand for it in the cache.
+
+    Delta and resumable exports stop at rows older than
+    WAITLIST_EXPORT_SETTLE_SECONDS and, off the primary, any export may miss
+    rows a secondary hasn't replicated yet. Once the version is older than
+    both, a fresh export would return the same rows.
+    """
+    if MONGO_EXPORT_READ_PREFERENCE == "primary":
+        settle_seconds = WAITLIST_EXPORT_SETTLE_SECONDS
+    elif MONGO_MAX_STALENESS_SECONDS < 0:
+        # No bound on how far a secondary may lag.
+        return False
+    else:
+        settle_seconds = max(WAITLIST_EXPORT_SETTLE_SECONDS, MONGO_MAX_STALENESS_SECONDS)
+    return time.time() - get_version_time(data_version) >= settle_seconds
+
+
+async def run_export_job(redis: Redis, job_id: str):
+    """
+    Run one export job that was moved to the processing list.
+
+    Args:
+        redis (Redis): The Redis client.
+        job_id (str): The id of the job.
+    """
+    job = await get_export_job(redis, job_id)
+    if job is None:
+        await redis.lrem(EXPORT_PROCESSING_KEY, 0, job_id)
+        return
+
+    attempts = int(job["attempts"]) + 1
+    await _update_job(redis, job_id, state=RUNNING, attempts=attempts, rows_processed=0, claimed_at=time.time())
+
+    rows_written = 0
+
+    async def on_rows(rows: int):
+        nonlocal rows_written
+        rows_written = rows
+        # Also serves as the heartbeat requeue_stale_jobs looks at.
+        await _update_job(redis, job_id, rows_processed=rows)
+
+    project_id = int(job["project_id"])
+    since = job.get("since")
+    export_key = job.get("export_key")
+    cacheable = export_key is not None and _is_settled(job["data_version"])
+    try:
+        # Fixed when the job starts so a retry exports the same range again.
+        until = job.get("until")
+        if until is None and (since or job.get("resumable")):
+            until = await get_export_watermark(project_id, since)
+            await _update_job(redis, job_id, until=until)
+
+        download_url, manifest_url, watermark = await download_waitlist(
+            project_id,
+            job["extension_type"],
+            int(job["user_id"]),
+            job["project_uuid"],
+            on_rows=on_rows,
+            since=since,
+            until=until,
+            compression=job.get("compression"),
+            pretty=bool(job.get("pretty")),
+            export_key=export_key,
+        )
+    except asyncio.CancelledError:
+        # The worker is shutting down; hand the job to another one right away.
+        await _update_job(redis, job_id, state=QUEUED, attempts=attempts - 1)
+        await redis.lrem(EXPORT_PROCESSING_KEY, 0, job_id)
+        await redis.rpush(EXPORT_QUEUE_KEY, job_id)
+        raise
+    except Exception as e:
+        logger.exception("Export job %s failed", job_id)
+        await redis.lrem(EXPORT_PROCESSING_KEY, 0, job_id)
+        await _retry_or_fail(redis, job_id, attempts, str(e) or type(e).__name__)
+        return
+
+    file_name = get_export_file_name(
+        int(job["user_id"]), job["project_uuid"], job["extension_type"], job.get("compression"), since, export_key
+    )
+    if export_key or since:
+        # Unlike the plain full export, nothing overwrites this file later.
+        await redis.zadd(EXPORT_FILES_KEY, {file_name: time.time()})
+
+    done = {"state": DONE, "download_url": download_url, "manifest_url": manifest_url}
+    if watermark:
+        done["watermark"] = watermark
+        await _advance_watermark(redis, project_id, int(job["user_id"]), job["extension_type"], watermark)
+    await _update_job(redis, job_id, **done)
+    if cacheable:
+        cached = {"file_name": file_name, "rows": rows_written}
+        if watermark:
+            cached["watermark"] = watermark
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(_cache_key(project_id, export_key), mapping=cached)
+            pipe.expire(_cache_key(project_id, export_key), EXPORT_CACHE_TTL)
+            await pipe.execute()
+    await _release_inflight(redis, job_id)
+    await redis.lrem(EXPORT_PROCESSING_KEY, 0, job_id)
+
+
+async def run_export_worker(redis: Redis, poll_seconds: int = 5):
+    """
+    Take export jobs off the queue and run them, one at a time, until cancelled.
+
+    Jobs are moved atomically to a processing list while they run so a
+    worker that dies mid-export doesn't lose them. Run several of these
+    for concurrency.
+
+    Args:
+        redis (Redis): The Redis client.
+        poll_seconds (int): How long to wait for a job before doing housekeeping.
+    """
+    while True:
+        try:
+            await promote_due_jobs(redis)
+            await requeue_stale_jobs(redis)
+            await delete_expired_export_files(redis)
+
+            job_id = await redis.blmove(EXPORT_QUEUE_KEY, EXPORT_PROCESSING_KEY, poll_seconds, "RIGHT", "LEFT")
+            if job_id is not None:
+                await run_export_job(redis, job_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Export worker loop failed")
+            await asyncio.sleep(1)
@@ -0,0 +1,401 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, status
+from pymongo import ASCENDING, DESCENDING
+
+from src.config.settings import (
+    WAITLIST_EXPORT_BATCH_SIZE,
+    WAITLIST_EXPORT_PARQUET_ROW_GROUP_SIZE,
+    WAITLIST_EXPORT_SETTLE_SECONDS,
+)
+from src.config.db.mongo_management.async_mongo_manager import async_project_waitlist_export_collection
+from src.apps.base.pagination import encode_cursor, decode_cursor
+
+# Optional: Parquet exports need pyarrow, zstd compression needs zstandard.
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+EXPORT_FIELDS = ("email", "date_added")
+EXPORT_PROJECTION = {"_id": 0, "email": 1, "date_added": 1}
+
+
+class CsvEncoder:
+    def start(self) -> str:
+        return self.encode([dict(zip(EXPORT_FIELDS, EXPORT_FIELDS))])
+
+    def encode(self, rows: List[Dict[str, str]]) -> str:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+        writer.writerows(rows)
+        return buffer.getvalue()
+
+    def end(self) -> str:
+        return ""
+
+
+class JsonEncoder:
+    def __init__(self, pretty: bool = False):
+        self._first = True
+        self._indent = 4 if pretty else None
+
+    def start(self) -> str:
+        return "["
+
+    def encode(self, rows: List[Dict[str, str]]) -> str:
+        if not rows:
+            return ""
+        chunk = ",\n".join(json.dumps(row, indent=self._indent) for row in rows)
+        prefix = "\n" if self._first else ",\n"
+        self._first = False
+        return prefix + chunk
+
+    def end(self) -> str:
+        return "]\n" if self._first else "\n]\n"
+
+
+class JsonLinesEncoder:
+    def start(self) -> str:
+        return ""
+
+    def encode(self, rows: List[Dict[str, str]]) -> str:
+        return "".join(json.dumps(row) + "\n" for row in rows)
+
+    def end(self) -> str:
+        return ""
+
+
+class XmlEncoder:
+    def start(self) -> str:
+        return '<?xml version="1.0" encoding="UTF-8"?>\n<waitlist>\n'
+
+    def encode(self, rows: List[Dict[str, str]]) -> str:
+        return "".join(
+            "<item>\n"
+            + "".join(f"<{field}>{escape(row[field])}</{field}>\n" for field in EXPORT_FIELDS)
+            + "</item>\n"
+            for row in rows
+        )
+
+    def end(self) -> str:
+        return "</waitlist>\n"
+
+
+class _ChunkSink(io.RawIOBase):
+    # A write-only file that hands out what was written since the last drain,
+    # while tell() keeps counting from the start as the Parquet writer expects.
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ParquetEncoder:
+    """
+    Buffers rows into row groups of row_group_size, with date_added as a timestamp column.
+
+    Row groups the size of a cursor batch would make the file slow to read
+    and grow the footer the writer keeps in memory.
+    """
+
+    def __init__(self, row_group_size: int = WAITLIST_EXPORT_PARQUET_ROW_GROUP_SIZE):
+        self._sink = _ChunkSink()
+        self._schema = pyarrow.schema([("email", pyarrow.string()), ("date_added", pyarrow.timestamp("us"))])
+        self._writer = pyarrow.parquet.ParquetWriter(self._sink, self._schema, compression="zstd")
+        self._row_group_size = row_group_size
+        self._emails = []
+        self._dates_added = []
+
+    def _write_row_group(self):
+        table = pyarrow.Table.from_pydict(
+            {"email": self._emails, "date_added": self._dates_added},
+            schema=self._schema,
+        )
+        self._writer.write_table(table, row_group_size=self._row_group_size)
+        self._emails = []
+        self._dates_added = []
+
+    def start(self) -> bytes:
+        return self._sink.drain()
+
+    def encode(self, rows: List[Dict[str, str]]) -> bytes:
+        for row in rows:
+            self._emails.append(row["email"])
+            self._dates_added.append(datetime.fromisoformat(row["date_added"]))
+            if len(self._emails) >= self._row_group_size:
+                self._write_row_group()
+        return self._sink.drain()
+
+    def end(self) -> bytes:
+        if self._emails:
+            self._write_row_group()
+        self._writer.close()
+        return self._sink.drain()
+
+
+EXPORT_ENCODERS = {
+    "csv": CsvEncoder,
+    "json": JsonEncoder,
+    "jsonl": JsonLinesEncoder,
+    "xml": XmlEncoder,
+    "parquet": ParquetEncoder,
+}
+
+
+def _make_encoder(extension_type: str, pretty: bool = False):
+    if extension_type == "json":
+        return JsonEncoder(pretty=pretty)
+    return EXPORT_ENCODERS[extension_type]()
+
+
+class GzipCompressor:
+    def __init__(self):
+        # wbits=31 writes the gzip container rather than a raw zlib stream.
+        self._compressor = zlib.compressobj(wbits=31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class ZstdCompressor:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor().compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+# compression: (compressor, file suffix, media type)
+EXPORT_COMPRESSIONS = {
+    "gzip": (GzipCompressor, ".gz", "application/gzip"),
+    "zstd": (ZstdCompressor, ".zst", "application/zstd"),
+}
+
+
+def validate_export_options(extension_type: str, compression: Optional[str] = None):
+    """
+    Reject export options this deployment can't produce.
+
+    Args:
+        extension_type (str): The file format.
+        compression (str, optional): gzip or zstd, for the text formats.
+    """
+    if extension_type not in EXPORT_ENCODERS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid extension type")
+    if extension_type == "parquet" and pyarrow is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Parquet exports are not available")
+
+    if compression is None:
+        return
+    if compression not in EXPORT_COMPRESSIONS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid compression")
+    if extension_type == "parquet":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet files are already compressed",
+        )
+    if compression == "zstd" and zstandard is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="zstd compression is not available")
+
+
+def get_export_file_suffix(extension_type: str, compression: Optional[str] = None) -> str:
+    """
+    Get the file name suffix of an export, e.g. ``csv.gz``.
+    """
+    return extension_type + (EXPORT_COMPRESSIONS[compression][1] if compression else "")
+
+
+def encode_watermark(date_added: datetime, document_id: ObjectId) -> str:
+    """
+    Encode the (date_added, _id) position of the last exported signup as an opaque token.
+    """
+    return encode_cursor({"d": date_added.isoformat(), "i": str(document_id)})
+
+
+def decode_watermark(watermark: str) -> Tuple[datetime, ObjectId]:
+    """
+    Decode a watermark made by encode_watermark.
+
+    Returns:
+        Tuple[datetime, ObjectId]: The date_added and _id of the last exported signup.
+    """
+    position = decode_cursor(watermark)
+    try:
+        return datetime.fromisoformat(position["d"]), ObjectId(position["i"])
+    except (KeyError, TypeError, ValueError, InvalidId):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid watermark")
+
+
+# Before any signup: an export up to it is empty, a delta after it holds everything.
+START_WATERMARK = encode_watermark(datetime(1970, 1, 1), ObjectId("0" * 24))
+
+
+def _range_query(project_id: int, since: Optional[str], until: Optional[str]) -> dict:
+    # The plain date_added bounds give the planner a tight index range; the
+    # $or clauses break ties on _id between signups with the same date_added.
+    conditions = [{"project_id": project_id}]
+    date_range = {}
+    if since:
+        date_added, document_id = decode_watermark(since)
+        date_range["$gte"] = date_added
+        conditions.append({"$or": [
+            {"date_added": {"$gt": date_added}},
+            {"date_added": date_added, "_id": {"$gt": document_id}},
+        ]})
+    if until:
+        date_added, document_id = decode_watermark(until)
+        date_range["$lte"] = date_added
+        conditions.append({"$or": [
+            {"date_added": {"$lt": date_added}},
+            {"date_added": date_added, "_id": {"$lte": document_id}},
+        ]})
+    if date_range:
+        conditions.append({"date_added": date_range})
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+async def get_export_watermark(project_id: int, since: Optional[str] = None) -> str:
+    """
+    Find where a delta or resumable export starting after ``since`` should stop.
+
+    That is the newest signup older than WAITLIST_EXPORT_SETTLE_SECONDS.
+    Every signup before it has been written by then, so a delta ending
+    there never skips rows that arrive late. Signups after it go in the
+    next delta. One lookup at the end of the (project_id, date_added, _id)
+    index. Full exports that aren't resumed from don't need it and export
+    every row.
+
+    Args:
+        project_id (int): The id of the project.
+        since (str, optional): The watermark of the previous export.
+
+    Returns:
+        str: The watermark to export up to; ``since``, or START_WATERMARK
+        without one, when there is nothing new.
+    """
+    cutoff = datetime.now() - timedelta(seconds=WAITLIST_EXPORT_SETTLE_SECONDS)
+    query = {"$and": [_range_query(project_id, since, None), {"date_added": {"$lt": cutoff}}]}
+    latest = await async_project_waitlist_export_collection.find_one(
+        query,
+        {"date_added": 1},
+        sort=[("date_added", DESCENDING), ("_id", DESCENDING)],
+    )
+    if latest is None:
+        return since or START_WATERMARK
+    return encode_watermark(latest["date_added"], latest["_id"])
+
+
+async def iter_export_batches(
+    project_id: int,
+    batch_size: int = WAITLIST_EXPORT_BATCH_SIZE,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> AsyncIterator[List[Dict[str, str]]]:
+    """
+    Iterate over a project's waitlist in signup order, one batch of rows at a time.
+
+    The cursor fetches batch_size documents per round trip, so only one
+    batch is held in memory however big the waitlist is. With watermarks
+    only the (project_id, date_added, _id) index range between them is read.
+
+    Args:
+        project_id (int): The id of the project.
+        batch_size (int): The number of rows per batch.
+        since (str, optional): Only signups after this watermark.
+        until (str, optional): Only signups up to and including this watermark.
+
+    Yields:
+        List[Dict[str, str]]: Rows with the EXPORT_FIELDS as strings.
+    """
+    cursor = (
+        async_project_waitlist_export_collection.find(_range_query(project_id, since, until), EXPORT_PROJECTION)
+        .sort([("date_added", ASCENDING), ("_id", ASCENDING)])
+        .batch_size(batch_size)
+    )
+    batch = []
+    async for document in cursor:
+        batch.append({"email": document["email"], "date_added": document["date_added"].isoformat()})
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def stream_waitlist_export(
+    project_id: int,
+    extension_type: str,
+    on_rows: Optional[Callable[[int], Awaitable[None]]] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    compression: Optional[str] = None,
+    pretty: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Encode a project's waitlist as it is read from Mongo.
+
+    Args:
+        project_id (int): The id of the project.
+        extension_type (str): csv, json, jsonl, xml or parquet.
+        on_rows (Callable[[int], Awaitable[None]], optional): Called with the number of rows encoded so far.
+        since (str, optional): Only signups after this watermark.
+        until (str, optional): Only signups up to and including this watermark.
+        compression (str, optional): gzip or zstd, applied to the encoded stream.
+        pretty (bool): Indent JSON objects.
+
+    Yields:
+        bytes: Chunks of the file, one per batch.
+    """
+    encoder = _make_encoder(extension_type, pretty)
+    compressor = EXPORT_COMPRESSIONS[compression][0]() if compression else None
+
+    def to_bytes(chunk) -> bytes:
+        data = chunk.encode() if isinstance(chunk, str) else chunk
+        return compressor.compress(data) if compressor else data
+
+    rows = 0
+    yield to_bytes(encoder.start())
+    async for batch in iter_export_batches(project_id, since=since, until=until):
+        yield to_bytes(encoder.encode(batch))
+        rows += len(batch)
+        if on_rows is not None:
+            await on_rows(rows)
+    yield to_bytes(encoder.end())
+    if compressor:
+        yield compressor.flush()
@@ -13,4 +13,9 @@ class ProjectResponseSchema(ProjectSchema):
 
     class Config:
         from_attributes = True
-        
\ No newline at end of file
+        
+
+class ProjectSummarySchema(ProjectResponseSchema):
+    signup_count: int
+    last_signup_at: Optional[str] = None
+    limit_usage: Optional[float] = Field(None, description="signup_count / limit, when the project has a limit.")
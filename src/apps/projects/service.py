@@ -1,79 +1,91 @@
 import json
-from typing import Annotated, Optional, List
+import asyncio
+from datetime import datetime
+from typing import Annotated, Awaitable, Callable, Optional
 from fastapi import HTTPException, status, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .models import Project
 from src.config.settings import BUCKET_NAME
-from src.config.db.redis_management.redis_manager import get_redis
 from src.apps.auth.models import User
-from src.apps.projects.schemas.response_schema import ProjectResponseSchema
-from src.apps.waitlist.schemas.waitlist_schema import WaitlistResponse
-from src.apps.base.s3_helpers import upload_data_to_s3
+from src.apps.projects.schemas.response_schema import ProjectResponseSchema, ProjectSummarySchema
+from src.apps.base.s3_helpers import S3MultipartWriter, generate_download_url, upload_data_to_s3
+from src.apps.projects.exporters import (
+    stream_waitlist_export,
+    get_export_file_suffix,
+    EXPORT_COMPRESSIONS,
+)
 
 
 
-def get_project_by_name(db: Session, name: str, owner_id: int):
+async def get_project_by_name(db: AsyncSession, name: str, owner_id: int):
     """
     Get a project by name from the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         name (str): The name of the project.
 
     Returns:
         Project: The project object.
     """
-    return db.query(Project).filter(Project.name == name, Project.owner_id == owner_id).first()
+    result = await db.execute(select(Project).where(Project.name == name, Project.owner_id == owner_id))
+    return result.scalars().first()
 
 
-def get_project_by_id(db: Session, project_id: int, owner_id: int):
+async def get_project_by_id(db: AsyncSession, project_id: int, owner_id: int):
     """
     Get a project by id from the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         project_id (int): The id of the project.
 
     Returns:
         Project: The project object.
     """
-    return db.query(Project).filter(Project.id == project_id, Project.owner_id == owner_id).first()
+    result = await db.execute(select(Project).where(Project.id == project_id, Project.owner_id == owner_id))
+    return result.scalars().first()
 
 
-def get_project_by_project_id(db: Session, project_id: str, owner_id: int):
+async def get_project_by_project_id(db: AsyncSession, project_id: str, owner_id: int):
     """
     Get a project by id from the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         project_id (int): The id of the project.
 
     Returns:
         Project: The project object.
     """
-    return db.query(Project).filter(Project.project_id == project_id, Project.owner_id == owner_id).first()
+    result = await db.execute(
+        select(Project).where(Project.project_id == project_id, Project.owner_id == owner_id)
+    )
+    return result.scalars().first()
 
 
-def get_all_projects(db: Session, owner_id: int):
+async def get_all_projects(db: AsyncSession, owner_id: int):
     """
     Get all projects from the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         List[Project]: The list of project objects.
     """
-    return db.query(Project).filter(Project.owner_id == owner_id).order_by("created_at").all()
+    result = await db.execute(select(Project).where(Project.owner_id == owner_id).order_by(Project.created_at))
+    return result.scalars().all()
 
 
-def create_project(db: Session, project: Project, ower_id: int):
+async def create_project(db: AsyncSession, project: Project, ower_id: int):
     """
     Create a new project in the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         project (Project): The project object.
 
     Returns:
@@ -81,38 +93,38 @@ def create_project(db: Session, project: Project, ower_id: int):
     """
     _project = Project(**project.dict(), owner_id=ower_id)
     db.add(_project)
-    db.commit()
-    db.refresh(_project)
+    await db.commit()
+    await db.refresh(_project)
     return _project
 
 
-def update_project(db: Session, project: Project):
+async def update_project(db: AsyncSession, project: Project):
     """
     Update a project in the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         project (Project): The project object.
 
     Returns:
         Project: The updated project object.
     """
-    existing_project = get_project_by_id(db, project.id, project.owner_id)
+    existing_project = await get_project_by_id(db, project.id, project.owner_id)
     if existing_project is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     for attr, value in vars(project).items():
         setattr(existing_project, attr, value)
 
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     return project
 
-def update_project_by_project_id(db: Session, existing_project: Project, project: Project):
+async def update_project_by_project_id(db: AsyncSession, existing_project: Project, project: Project):
     """
     Update a project in the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         project (Project): The project object.
 
     Returns:
@@ -121,8 +133,8 @@ def update_project_by_project_id(db: Session, existing_project: Project, project
     for attr, value in vars(project).items():
         setattr(existing_project, attr, value)
 
-    db.commit()
-    db.refresh(existing_project)
+    await db.commit()
+    await db.refresh(existing_project)
     return existing_project
 
 
@@ -138,83 +150,160 @@ def create_project_response_data(project: Project):
         description=project.description,
     ).dict()
 
-EXTENSION_TYPES = {
-    "csv": "text/csv",
-    "json": "application/json",
-    "xml": "application/xml",
-}
 
-def download_waitlist_csv(waitlist_data: List[WaitlistResponse]):
+def create_project_summary_data(project: Project, signup_count: int, last_signup_at: Optional[datetime]):
     """
-    Download the waitlist data as a CSV file.
+    Create the summary response data of a project.
 
     Args:
-        waitlist_data (List[WaitlistResponse]): The waitlist data.
+        project (Project): The project object.
+        signup_count (int): The number of signups of the project.
+        last_signup_at (datetime, optional): The time of the newest signup.
 
     Returns:
-        str: The CSV data.
+        dict: The ProjectSummarySchema data.
     """
-    csv_data = "email,date_added\n"
-    for item in waitlist_data:
-        csv_data += f"{item.email},{item.date_added}\n"
-    return csv_data
+    return ProjectSummarySchema(
+        **create_project_response_data(project),
+        signup_count=signup_count,
+        last_signup_at=last_signup_at.isoformat() if last_signup_at else None,
+        limit_usage=round(signup_count / project.limit, 4) if project.limit else None,
+    ).dict()
+
+EXTENSION_TYPES = {
+    "csv": "text/csv",
+    "json": "application/json",
+    "jsonl": "application/x-ndjson",
+    "xml": "application/xml",
+    "parquet": "application/vnd.apache.parquet",
+}
 
 
-def download_waitlist_json(waitlist_data: List[WaitlistResponse]):
+def get_export_media_type(extension_type: str, compression: Optional[str] = None):
     """
-    Download the waitlist data as a JSON file.
+    Get the content type of an export file.
 
     Args:
-        waitlist_data (List[WaitlistResponse]): The waitlist data.
+        extension_type (str): The file extension type.
+        compression (str, optional): gzip or zstd.
 
     Returns:
-        str: The JSON data.
+        str: The content type.
     """
-    return json.dumps([item.dict() for item in waitlist_data], indent=4)
-
-def download_waitlist_xml(waitlist_data: List[WaitlistResponse]):
+    if compression:
+        return EXPORT_COMPRESSIONS[compression][2]
+    return EXTENSION_TYPES[extension_type]
+
+
+def get_export_file_name(
+    user_id: int,
+    project_uuid: str,
+    extension_type: str,
+    compression: Optional[str] = None,
+    since: Optional[str] = None,
+    export_key: Optional[str] = None,
+) -> str:
     """
-    Download the waitlist data as a XML file.
+    Get the S3 key of a waitlist export.
 
     Args:
-        waitlist_data (List[WaitlistResponse]): The waitlist data.
+        user_id (int): The user id.
+        project_uuid (str): The project UUID.
+        extension_type (str): The file extension type.
+        compression (str, optional): gzip or zstd, for the text formats.
+        since (str, optional): The watermark a delta export starts after.
+        export_key (str, optional): Names the file after the export's options and data
+            version instead of the time, so a cached export is never overwritten.
 
     Returns:
-        str: The XML data.
+        str: The object key.
     """
-    xml_data = '<?xml version="1.0" encoding="UTF-8"?>\n<waitlist>\n'
-    for item in waitlist_data:
-        xml_data += f"<item>\n<email>{item.email}</email>\n<date_added>{item.date_added}</date_added>\n</item>\n"
-    xml_data += "</waitlist>\n"
-    return xml_data
-
-async def download_waitlist(waitlist_data: List[WaitlistResponse], extension_type: str, user_id:int, project_uuid: str, download_id: Optional[str] = None):
+    suffix = get_export_file_suffix(extension_type, compression)
+    tag = export_key or datetime.now().strftime("%Y%m%dT%H%M%S")
+    if since:
+        return f"{user_id}/{project_uuid}-waitlist-delta-{tag}.{suffix}"
+    if export_key:
+        return f"{user_id}/{project_uuid}-waitlist-{tag}.{suffix}"
+    return f"{user_id}/{project_uuid}-waitlist.{suffix}"
+
+
+def get_export_manifest_name(file_name: str) -> str:
+    return f"{file_name}.manifest.json"
+
+
+async def download_waitlist(
+    project_id: int,
+    extension_type: str,
+    user_id: int,
+    project_uuid: str,
+    on_rows: Optional[Callable[[int], Awaitable[None]]] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    compression: Optional[str] = None,
+    pretty: bool = False,
+    export_key: Optional[str] = None,
+):
     """
-    Download the waitlist data as a CSV file.
+    Export the waitlist of a project to S3 and get a download link.
+
+    Cursor batches are encoded and streamed into a multipart upload, so the
+    memory used is one batch plus one part whatever the waitlist size. A
+    JSON manifest is uploaded next to the file with the watermark to pass as
+    ``since`` for the next delta, when the export was bounded by one.
 
     Args:
-        waitlist_data (List[WaitlistResponse]): The waitlist data.
+        project_id (int): The id of the project.
         extension_type (str): The file extension type.
         user_id (int): The user id.
         project_uuid (str): The project UUID.
+        on_rows (Callable[[int], Awaitable[None]], optional): Called with the number of rows written so far.
+        since (str, optional): Export only the signups after this watermark (a delta export).
+        until (str, optional): Export only up to this watermark (see get_export_watermark). Defaults to every row.
+        compression (str, optional): gzip or zstd, for the text formats.
+        pretty (bool): Indent JSON objects.
+        export_key (str, optional): See get_export_file_name.
 
     Returns:
-        str: The S3 link to the download file
+        Tuple[str, str, Optional[str]]: The S3 links to the file and the manifest, and the watermark.
     """
-    
-    if extension_type == "csv":
-        dump_data = download_waitlist_csv(waitlist_data)
-    elif extension_type == "json":
-        dump_data = download_waitlist_json(waitlist_data)
-    elif extension_type == "xml":
-        dump_data = download_waitlist_xml(waitlist_data)
-
-    file_name = f"{user_id}/{project_uuid}-waitlist.{extension_type}"
-
-    download_url = upload_data_to_s3(dump_data, file_name, BUCKET_NAME, expiry=3600)
-
-    if download_id:
-        redis = await get_redis()
-        await redis.set(download_id, download_url, ex=3600)
-
-    return download_url
+    file_name = get_export_file_name(user_id, project_uuid, extension_type, compression, since, export_key)
+    # Without an upper bound every row is exported and the manifest has no
+    # watermark: late writes can land before the last row, and a delta
+    # starting from it would skip them.
+    watermark = until
+    rows = 0
+
+    async def count_rows(count: int):
+        nonlocal rows
+        rows = count
+        if on_rows is not None:
+            await on_rows(count)
+
+    writer = await asyncio.to_thread(
+        S3MultipartWriter, BUCKET_NAME, file_name, get_export_media_type(extension_type, compression)
+    )
+    try:
+        async for chunk in stream_waitlist_export(
+            project_id, extension_type, count_rows, since, until, compression, pretty
+        ):
+            await asyncio.to_thread(writer.write, chunk)
+        await asyncio.to_thread(writer.complete)
+    except BaseException:
+        await asyncio.to_thread(writer.abort)
+        raise
+
+    manifest = {
+        "project_id": project_uuid,
+        "format": extension_type,
+        "compression": compression,
+        "file": file_name,
+        "rows": rows,
+        "since": since,
+        "watermark": watermark,
+        "created_at": datetime.now().isoformat(),
+    }
+    manifest_url = await asyncio.to_thread(
+        upload_data_to_s3, json.dumps(manifest, indent=2), get_export_manifest_name(file_name), BUCKET_NAME, 3600
+    )
+
+    return generate_download_url(BUCKET_NAME, file_name, expiry=3600), manifest_url, watermark
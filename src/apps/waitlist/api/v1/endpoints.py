@@ -1,11 +1,17 @@
 from datetime import datetime
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Request, status
+from fastapi import APIRouter, HTTPException, Request, status, Depends, Header
 from fastapi.responses import JSONResponse
 from fastapi.security import APIKeyHeader
+from pymongo.errors import DuplicateKeyError
+from redis.asyncio import Redis
 
-# from app import limiter
-from src.config.db.mongo_management.mongo_manager import waitlist_collection
+from src.config.db.mongo_management.async_mongo_manager import async_waitlist_collection
+from src.config.db.redis_management.redis_manager import get_redis
+from src.config.settings import WAITLIST_IP_RATE_LIMIT
+from src.apps.base.rate_limiter import enforce_rate_limit, get_client_ip
+from src.apps.base.idempotency import run_idempotent
 from src.apps.base.schemas.reponse_types import (
     SuccessResponse,
     ResponseSchema,
@@ -42,23 +48,29 @@ router = APIRouter(prefix="/v1")
     },
     tags=["Waitlist"],
 )
-# @limiter.limit("20/minute")
 async def add_to_waitlist(
     request: Request,
     payload: WaitlistRequest,
+    redis: Redis = Depends(get_redis),
+    idempotency_key: Optional[str] = Header(None, description="Retries with the same key replay the first response"),
 ):
 
-    current_time = datetime.now()
-    request_body = payload.model_dump()
+    async def process():
+        await enforce_rate_limit(redis, f"waitlist:ip:{get_client_ip(request)}", WAITLIST_IP_RATE_LIMIT)
 
-    if waitlist_collection.find_one({"email": request_body.get("email")}):
-        raise HTTPException(status_code=400, detail="Email already in the waitlist")
+        current_time = datetime.now()
+        request_body = payload.model_dump()
 
-    waitlist_collection.insert_one(
-        {"email": request_body.get("email"), "date_added": current_time}
-    )
+        try:
+            await async_waitlist_collection.insert_one(
+                {"email": request_body.get("email"), "date_added": current_time}
+            )
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Email already in the waitlist")
 
-    return JSONResponse(
-        status_code=200,
-        content={"message": "Email added to waitlist successfully!"}
-    )
+        return JSONResponse(
+            status_code=200,
+            content={"message": "Email added to waitlist successfully!"}
+        )
+
+    return await run_idempotent(redis, "waitlist:v1", idempotency_key, payload.email, process)
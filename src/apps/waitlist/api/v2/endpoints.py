@@ -1,14 +1,15 @@
+import logging
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, Request, status, Security, Depends
+from fastapi import APIRouter, HTTPException, Request, status, Security, Depends, Header
 from fastapi.responses import JSONResponse
 from fastapi.security import APIKeyHeader
-from sqlalchemy.orm import Session
+from pymongo.errors import DuplicateKeyError
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
 
-# from app import limiter
-
-from src.config.db.mongo_management.mongo_manager import project_waitlist_collection
+from src.config.db.mongo_management.async_mongo_manager import async_project_waitlist_collection
 from src.apps.base.schemas.reponse_types import (
     SuccessResponse,
     ResponseSchema,
@@ -19,23 +20,121 @@ from src.apps.base.schemas.reponse_types import (
     ServiceUnavailableResponse,
     TooManyRequestsReponse,
 )
-from src.apps.waitlist.schemas.waitlist_schema import WaitlistResponse, WaitlistRequest
-from src.apps.api_key.service import verify_api_key
-from src.config.db.postgres_management.pg_manager import get_db
+from src.apps.waitlist.schemas.waitlist_schema import (
+    WaitlistResponse,
+    WaitlistRequest,
+    BulkWaitlistItemResult,
+    BulkWaitlistResponse,
+)
+from src.apps.waitlist.service import (
+    iter_bulk_payload,
+    parse_bulk_item,
+    insert_project_signups,
+    record_accepted_signups,
+    build_signup_document,
+)
+from src.apps.waitlist.bloom import bloom_might_contain, bloom_add
+from src.apps.waitlist.counters import reserve_signup_slots, release_signup_slots
+from src.apps.waitlist.write_behind import ingest_uses_stream, enqueue_signup
+from src.config.settings import WAITLIST_BULK_BATCH_SIZE, WAITLIST_BULK_MAX_ITEMS, WAITLIST_IP_RATE_LIMIT
+from src.apps.base.rate_limiter import enforce_rate_limit, get_client_ip, get_api_key_rate
+from src.apps.base.idempotency import run_idempotent
+from src.apps.api_key.cache import get_verified_api_key
+from src.apps.api_key.schemas.api_key_schema import VerifiedAPIKeySchema
+from src.config.db.postgres_management.pg_manager import get_async_db
+from src.config.db.redis_management.redis_manager import get_redis
 
 
+logger = logging.getLogger(__name__)
+
 api_key_header = APIKeyHeader(name="api-key", auto_error=False)
 
 router = APIRouter(prefix="/v2")
 
 
 
+async def _add_signup(
+    request: Request, payload: WaitlistRequest, db: AsyncSession, redis: Redis, key: Optional[str]
+) -> JSONResponse:
+    """
+    Add one email to the waitlist of the project an API key belongs to.
+
+    Args:
+        request (Request): The incoming request.
+        payload (WaitlistRequest): The signup.
+        db (AsyncSession): The database session.
+        redis (Redis): The Redis client.
+        key (str, optional): The API key.
+
+    Returns:
+        JSONResponse: 202 when buffered in the ingest stream, 200 when written to Mongo.
+    """
+    await enforce_rate_limit(redis, f"waitlist:ip:{get_client_ip(request)}", WAITLIST_IP_RATE_LIMIT)
+
+    api_key = await get_verified_api_key(db, redis, key)
+    if not api_key:
+        raise HTTPException(status_code=400, detail="Invalid API key")
+
+    await enforce_rate_limit(
+        redis, f"waitlist:api_key:{api_key.id}", get_api_key_rate(api_key.id, api_key.project_id)
+    )
+
+    current_time = datetime.now()
+    request_body = payload.model_dump()
+    email = request_body.get("email")
+
+    if ingest_uses_stream():
+        # Most signups are new emails, so the filter usually answers without
+        # touching Mongo; the lookup only runs when it says "maybe".
+        if await bloom_might_contain(redis, api_key.project_id, email):
+            if await async_project_waitlist_collection.find_one(
+                {"email": email, "project_id": api_key.project_id}, {"_id": 1}
+            ):
+                raise HTTPException(status_code=400, detail="Email already in the waitlist")
+
+        if not await reserve_signup_slots(redis, api_key.project_id, api_key.project_limit):
+            raise HTTPException(status_code=403, detail="Waitlist limit reached for this project")
+
+        try:
+            await enqueue_signup(redis, api_key.project_id, email, current_time)
+        except Exception:
+            await release_signup_slots(redis, api_key.project_id)
+            raise
+        await bloom_add(redis, api_key.project_id, [email])
+        return JSONResponse(
+            content={"message": "Email added to waitlist successfully!"},
+            status_code=status.HTTP_202_ACCEPTED
+        )
+
+    if not await reserve_signup_slots(redis, api_key.project_id, api_key.project_limit):
+        raise HTTPException(status_code=403, detail="Waitlist limit reached for this project")
+
+    try:
+        await async_project_waitlist_collection.insert_one(
+            build_signup_document(api_key.project_id, email, current_time)
+        )
+    except Exception as e:
+        await release_signup_slots(redis, api_key.project_id)
+        if isinstance(e, DuplicateKeyError):
+            raise HTTPException(status_code=400, detail="Email already in the waitlist")
+        raise
+
+    await record_accepted_signups(redis, api_key.project_id, [email], [current_time])
+
+    return JSONResponse(
+        content={"message": "Email added to waitlist successfully!"},
+        status_code=status.HTTP_200_OK
+    )
+
+
 @router.post(
     "/add",
     summary="Add to Waitlist",
     responses={
         200: {"description": "Successful response", "model": SuccessResponse},
+        202: {"description": "Accepted, written to the waitlist shortly", "model": SuccessResponse},
         400: {"description": "Bad request", "model": BadRequestResponse},
+        403: {"description": "Waitlist limit reached", "model": BadRequestResponse},
         429: {"description": "Too many requests", "model": TooManyRequestsReponse},
         500: {
             "description": "Internal Server Error",
@@ -49,30 +148,145 @@ router = APIRouter(prefix="/v2")
     },
     tags=["Waitlist"],
 )
-# @limiter.limit("20/minute")
 async def add_to_waitlist_v2(
     request: Request,
     payload: WaitlistRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    redis: Redis = Depends(get_redis),
     key: str = Security(api_key_header),
+    idempotency_key: Optional[str] = Header(None, description="Retries with the same key replay the first response"),
 ) -> SuccessResponse:
 
-    # TODO: verify API key
-    api_key = verify_api_key(db, key)
-    if not api_key:
-        raise HTTPException(status_code=400, detail="Invalid API key")
+    return await run_idempotent(
+        redis,
+        f"waitlist:v2:{key}",
+        idempotency_key,
+        payload.email,
+        lambda: _add_signup(request, payload, db, redis, key),
+    )
 
+
+async def _flush_bulk_batch(
+    redis: Redis, api_key: VerifiedAPIKeySchema, batch: list, results: List[BulkWaitlistItemResult]
+):
+    """
+    Reserve slots for, insert and record one batch of parsed bulk items.
+
+    Args:
+        redis (Redis): The Redis client.
+        api_key (VerifiedAPIKeySchema): The verified API key the request was made with.
+        batch (list): The (index, email) pairs to add; cleared once written.
+        results (List[BulkWaitlistItemResult]): Where each item's result is appended.
+    """
     current_time = datetime.now()
-    request_body = payload.model_dump()
+    granted = await reserve_signup_slots(redis, api_key.project_id, api_key.project_limit, len(batch))
+    allowed, over_limit = batch[:granted], batch[granted:]
+
+    try:
+        statuses = await insert_project_signups(
+            api_key.project_id, [email for _, email in allowed], [current_time] * len(allowed)
+        )
+    except Exception:
+        # The write itself failed (network, timeout); none of the batch is
+        # known to be stored, so report it failed and give the slots back.
+        logger.exception("Bulk insert failed for project %s", api_key.project_id)
+        statuses = [("failed", "Could not write to the waitlist; retry these items")] * len(allowed)
+    accepted = []
+    for (index, email), (item_status, error) in zip(allowed, statuses):
+        results.append(BulkWaitlistItemResult(index=index, email=email, status=item_status, error=error))
+        if item_status == "accepted":
+            accepted.append(email)
+    for index, email in over_limit:
+        results.append(
+            BulkWaitlistItemResult(
+                index=index, email=email, status="over_limit", error="Waitlist limit reached for this project"
+            )
+        )
 
-    if project_waitlist_collection.find_one({"email": request_body.get("email"), "project_id": api_key.project_id}):
-        raise HTTPException(status_code=400, detail="Email already in the waitlist")
+    await release_signup_slots(redis, api_key.project_id, granted - len(accepted))
+    await record_accepted_signups(redis, api_key.project_id, accepted, [current_time] * len(accepted))
+    batch.clear()
 
-    project_waitlist_collection.insert_one(
-        {"email": request_body.get("email"), "project_id": api_key.project_id, "date_added": current_time}
+
+@router.post(
+    "/add/bulk",
+    summary="Add many emails to Waitlist",
+    description=(
+        "Accepts a JSON array of `WaitlistRequest` items, or a streamed NDJSON body "
+        "(`Content-Type: application/x-ndjson`) with one item per line."
+    ),
+    responses={
+        200: {"description": "Successful response", "model": BulkWaitlistResponse},
+        400: {"description": "Bad request", "model": BadRequestResponse},
+        413: {"description": "JSON array body too large", "model": BadRequestResponse},
+        429: {"description": "Too many requests", "model": TooManyRequestsReponse},
+        500: {
+            "description": "Internal Server Error",
+            "model": InternalServerErrorResponse,
+        },
+        502: {"description": "Bad Gateway", "model": BadGatewayResponse},
+        503: {
+            "description": "Service Unavailable",
+            "model": ServiceUnavailableResponse,
+        },
+    },
+    tags=["Waitlist"],
+)
+async def add_to_waitlist_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    redis: Redis = Depends(get_redis),
+    key: str = Security(api_key_header),
+) -> JSONResponse:
+
+    await enforce_rate_limit(redis, f"waitlist:ip:{get_client_ip(request)}", WAITLIST_IP_RATE_LIMIT)
+
+    api_key = await get_verified_api_key(db, redis, key)
+    if not api_key:
+        raise HTTPException(status_code=400, detail="Invalid API key")
+
+    await enforce_rate_limit(
+        redis, f"waitlist:api_key:{api_key.id}", get_api_key_rate(api_key.id, api_key.project_id)
     )
 
-    return JSONResponse(
-       content={"message": "Email added to waitlist successfully!"},
-        status_code=status.HTTP_200_OK
+    results: List[BulkWaitlistItemResult] = []
+    batch = []
+
+    index = -1
+    async for raw_item in iter_bulk_payload(request):
+        index += 1
+        if index >= WAITLIST_BULK_MAX_ITEMS:
+            # Stop reading; one result stands for everything after the limit.
+            results.append(
+                BulkWaitlistItemResult(
+                    index=index,
+                    status="invalid",
+                    error=f"Bulk requests are limited to {WAITLIST_BULK_MAX_ITEMS} items; the rest was ignored",
+                )
+            )
+            break
+
+        email, error = parse_bulk_item(raw_item)
+        if error:
+            results.append(BulkWaitlistItemResult(index=index, status="invalid", error=error))
+            continue
+
+        batch.append((index, email))
+        if len(batch) >= WAITLIST_BULK_BATCH_SIZE:
+            await _flush_bulk_batch(redis, api_key, batch, results)
+
+    if batch:
+        await _flush_bulk_batch(redis, api_key, batch, results)
+
+    results.sort(key=lambda result: result.index)
+    response = BulkWaitlistResponse(
+        message="Bulk waitlist import processed",
+        accepted=sum(result.status == "accepted" for result in results),
+        duplicates=sum(result.status == "duplicate" for result in results),
+        invalid=sum(result.status == "invalid" for result in results),
+        over_limit=sum(result.status == "over_limit" for result in results),
+        failed=sum(result.status == "failed" for result in results),
+        results=results,
     )
+
+    return JSONResponse(content=response.model_dump(), status_code=status.HTTP_200_OK)
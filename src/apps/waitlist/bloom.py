@@ -0,0 +1,130 @@
+import hashlib
+import math
+from typing import Iterable, List
+
+from redis.asyncio import Redis
+
+from src.config.settings import WAITLIST_BLOOM_EXPECTED_ITEMS, WAITLIST_BLOOM_FALSE_POSITIVE_RATE
+from src.config.db.mongo_management.async_mongo_manager import async_project_waitlist_collection
+from src.config.db.redis_management.redis_manager import register_script
+
+BLOOM_KEY_PREFIX = "waitlist:bloom:"
+
+# Standard Bloom filter sizing for n expected items at false positive rate p.
+BLOOM_SIZE_BITS = math.ceil(
+    -WAITLIST_BLOOM_EXPECTED_ITEMS * math.log(WAITLIST_BLOOM_FALSE_POSITIVE_RATE) / math.log(2) ** 2
+)
+BLOOM_HASH_COUNT = max(1, round(BLOOM_SIZE_BITS / WAITLIST_BLOOM_EXPECTED_ITEMS * math.log(2)))
+
+# Swaps the rebuilt filter KEYS[1] in for the live filter KEYS[2] and marks
+# it ready (KEYS[3]). Bits set in the live filter while the rebuild scanned
+# Mongo are ORed in first; after a resize that can only add false positives.
+# A live filter longer than the rebuilt one came from larger settings and is
+# dropped rather than grow the new filter.
+SWAP_FILTER_SCRIPT = """
+if redis.call('STRLEN', KEYS[2]) <= redis.call('STRLEN', KEYS[1]) then
+    redis.call('BITOP', 'OR', KEYS[1], KEYS[1], KEYS[2])
+end
+redis.call('RENAME', KEYS[1], KEYS[2])
+redis.call('SET', KEYS[3], 1)
+"""
+
+_swap_filter = register_script(SWAP_FILTER_SCRIPT)
+
+
+def _filter_key(project_id: int) -> str:
+    return f"{BLOOM_KEY_PREFIX}{project_id}"
+
+
+def _ready_key(project_id: int) -> str:
+    return f"{BLOOM_KEY_PREFIX}{project_id}:ready"
+
+
+def _bit_offsets(email: str) -> List[int]:
+    # Double hashing: k offsets derived from two 64-bit halves of one digest.
+    digest = hashlib.sha256(email.encode()).digest()
+    h1 = int.from_bytes(digest[:8], "big")
+    h2 = int.from_bytes(digest[8:16], "big") | 1
+    return [(h1 + i * h2) % BLOOM_SIZE_BITS for i in range(BLOOM_HASH_COUNT)]
+
+
+async def bloom_might_contain(redis: Redis, project_id: int, email: str) -> bool:
+    """
+    Check whether an email may already be in a project's waitlist.
+
+    ``False`` is definitive. ``True`` means the authoritative check in Mongo
+    is still needed, and is also returned while the project's filter has not
+    been built yet.
+
+    Args:
+        redis (Redis): The Redis client.
+        project_id (int): The id of the project.
+        email (str): The email to check.
+
+    Returns:
+        bool: Whether the email may be present.
+    """
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.exists(_ready_key(project_id))
+        for offset in _bit_offsets(email):
+            pipe.getbit(_filter_key(project_id), offset)
+        ready, *bits = await pipe.execute()
+
+    return not ready or all(bits)
+
+
+async def bloom_add(redis: Redis, project_id: int, emails: Iterable[str]):
+    """
+    Add emails to a project's Bloom filter.
+
+    Args:
+        redis (Redis): The Redis client.
+        project_id (int): The id of the project.
+        emails (Iterable[str]): The emails to add.
+    """
+    async with redis.pipeline(transaction=False) as pipe:
+        for email in emails:
+            for offset in _bit_offsets(email):
+                pipe.setbit(_filter_key(project_id), offset, 1)
+        await pipe.execute()
+
+
+async def mark_bloom_filter_empty(redis: Redis, project_id: int):
+    """
+    Mark the filter of a project that has no signups yet as ready.
+
+    Args:
+        redis (Redis): The Redis client.
+        project_id (int): The id of the project.
+    """
+    await redis.set(_ready_key(project_id), 1)
+
+
+async def rebuild_bloom_filter(redis: Redis, project_id: int) -> int:
+    """
+    Rebuild a project's Bloom filter from project_waitlist_collection.
+
+    The filter is built in memory and swapped in atomically, keeping the
+    bits that signups added to the live filter while Mongo was scanned. It
+    has to be rebuilt after changing the sizing settings.
+
+    Args:
+        redis (Redis): The Redis client.
+        project_id (int): The id of the project.
+
+    Returns:
+        int: The number of emails added to the filter.
+    """
+    bits = bytearray(math.ceil(BLOOM_SIZE_BITS / 8))
+    count = 0
+    async for document in async_project_waitlist_collection.find({"project_id": project_id}, {"email": 1, "_id": 0}):
+        for offset in _bit_offsets(document["email"]):
+            # SETBIT offset 0 is the most significant bit of the first byte.
+            bits[offset >> 3] |= 0x80 >> (offset & 7)
+        count += 1
+
+    temp_key = f"{_filter_key(project_id)}:rebuild"
+    await redis.set(temp_key, bytes(bits))
+    await _swap_filter(keys=[temp_key, _filter_key(project_id), _ready_key(project_id)], client=redis)
+
+    return count
@@ -0,0 +1,300 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from redis.asyncio import Redis
+
+from src.config.settings import WAITLIST_COUNTER_LIMIT_RECHECK_SECONDS, WAITLIST_COUNTER_RECONCILE_SECONDS
+from src.config.db.redis_management.redis_manager import register_script
+from src.config.db.mongo_management.async_mongo_manager import (
+    async_project_waitlist_collection,
+    async_project_waitlist_analytics_collection,
+)
+
+logger = logging.getLogger(__name__)
+
+COUNTER_KEY_PREFIX = "waitlist:count:"
+LAST_SIGNUP_KEY_PREFIX = "waitlist:last_signup:"
+STREAM_PENDING_KEY_PREFIX = "waitlist:stream_pending:"
+
+# Grants up to ARGV[2] slots without going over the limit in ARGV[1] and
+# reports whether a reconciliation is due (the marker in KEYS[2] expired).
+# Returns -1 slots when the counter has not been initialised yet.
+RESERVE_SLOTS_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return {-1, 0}
+end
+local due = redis.call('SET', KEYS[2], 1, 'EX', ARGV[3], 'NX') and 1 or 0
+local granted = math.min(tonumber(ARGV[2]), tonumber(ARGV[1]) - tonumber(current))
+if granted <= 0 then
+    return {0, due}
+end
+redis.call('INCRBY', KEYS[1], granted)
+return {granted, due}
+"""
+
+# Keeps the greater of the stored and the given timestamp, so batches
+# flushed out of order never move the last signup time backwards.
+SET_MAX_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]))
+if not current or tonumber(ARGV[1]) > current then
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+# Sets the counter from a Mongo count (ARGV[1]) plus the signups still buffered
+# in the ingest stream (KEYS[2]). Reservations made while Mongo was being
+# counted are kept by applying the count as a difference against the counter
+# value read just before counting (ARGV[2], empty if it didn't exist yet).
+RECONCILE_SCRIPT = """
+local count = tonumber(ARGV[1]) + (tonumber(redis.call('GET', KEYS[2])) or 0)
+local current = tonumber(redis.call('GET', KEYS[1]))
+if not current then
+    redis.call('SET', KEYS[1], count)
+    return count
+end
+if ARGV[2] == '' then
+    -- Another reconcile initialised the counter meanwhile; keep it.
+    return current
+end
+count = count + current - tonumber(ARGV[2])
+redis.call('SET', KEYS[1], count)
+return count
+"""
+
+_reserve_slots = register_script(RESERVE_SLOTS_SCRIPT)
+_set_max = register_script(SET_MAX_SCRIPT)
+_reconcile = register_script(RECONCILE_SCRIPT)
+
+# Stands in for "no limit" so unlimited projects are still counted.
+UNLIMITED = 2 ** 53
+
+_reconcile_tasks = set()
+
+
+def _counter_key(project_id: int) -> str:
+    return f"{COUNTER_KEY_PREFIX}{project_id}"
+
+
+def _reconciled_key(project_id: int) -> str:
+    return f"{COUNTER_KEY_PREFIX}{project_id}:reconciled"
+
+
+def _limit_recheck_key(project_id: int) -> str:
+    return f"{COUNTER_KEY_PREFIX}{project_id}:limit_recheck"
+
+
+def _last_signup_key(project_id: int) -> str:
+    return f"{LAST_SIGNUP_KEY_PREFIX}{project_id}"
+
+
+def stream_pending_key(project_id: int) -> str:
+    """
+    Get the key counting a project's signups buffered in the ingest stream.
+
+    It is incremented with the XADD and decremented with the XDEL of each
+    entry, in the same transaction, so reconciliation can count them.
+    """
+    return f"{STREAM_PENDING_KEY_PREFIX}{project_id}"
+
+
+async def reconcile_signup_count(redis: Redis, project_id: int) -> int:
+    """
+    Reset a project's signup counter to the number of documents in Mongo.
+
+    Signups still buffered in the ingest stream are added to the count, and
+    slots reserved while Mongo is being counted are kept. Mongo and Redis
+    can't be read atomically together, so signups written during the count
+    can be off by one each:
+
+    - a reservation whose insert is in progress can be missed (undercount);
+    - a slot reserved after the snapshot and inserted before the count, or a
+      stream entry inserted but not yet deleted from the stream, is counted
+      twice (overcount).
+
+    Both windows only last while a write is in flight, and the next reconcile
+    corrects them. reserve_signup_slots reconciles before turning signups
+    away at the limit, so an overcount doesn't reject them.
+
+    Args:
+        redis (Redis): The Redis client.
+        project_id (int): The id of the project.
+
+    Returns:
+        int: The reconciled number of signups.
+    """
+    snapshot = await redis.get(_counter_key(project_id))
+    count = await async_project_waitlist_collection.count_documents({"project_id": project_id})
+    return await _apply_count(redis, project_id, count, snapshot)
+
+
+async def _apply_count(redis: Redis, project_id: int, count: int, snapshot: Optional[str]) -> int:
+    # snapshot is the counter value read before Mongo was counted.
+    count = await _reconcile(
+        keys=[_counter_key(project_id), stream_pending_key(project_id)],
+        args=[count, snapshot if snapshot is not None else ""],
+        client=redis,
+    )
+    await redis.set(_reconciled_key(project_id), 1, ex=WAITLIST_COUNTER_RECONCILE_SECONDS)
+    return max(int(count), 0)
+
+
+async def _reconcile_in_background(redis: Redis, project_id: int):
+    try:
+        await reconcile_signup_count(redis, project_id)
+    except Exception:
+        logger.exception("Could not reconcile the signup counter of project %s", project_id)
+
+
+async def reserve_signup_slots(redis: Redis, project_id: int, limit: Optional[int], requested: int = 1) -> int:
+    """
+    Atomically reserve room for new signups under a project's limit.
+
+    The counter is incremented by the number of slots granted; release the
+    slots that do not end up as accepted inserts. The counter is reconciled
+    against Mongo at most every WAITLIST_COUNTER_RECONCILE_SECONDS, in the
+    background, so this usually costs one Redis round trip however big the
+    waitlist is. When the limit is hit it is reconciled first (at most every
+    WAITLIST_COUNTER_LIMIT_RECHECK_SECONDS) in case the counter ran high.
+
+    Args:
+        redis (Redis): The Redis client.
+        project_id (int): The id of the project.
+        limit (int, optional): The maximum number of signups of the project, ``None`` for no limit.
+        requested (int): The number of slots wanted.
+
+    Returns:
+        int: The number of slots granted, between 0 and ``requested``.
+    """
+    keys = [_counter_key(project_id), _reconciled_key(project_id)]
+    args = [UNLIMITED if limit is None else limit, requested, WAITLIST_COUNTER_RECONCILE_SECONDS]
+    granted, reconcile_due = await _reserve_slots(keys=keys, args=args, client=redis)
+
+    if granted == -1:
+        await reconcile_signup_count(redis, project_id)
+        granted, _ = await _reserve_slots(keys=keys, args=args, client=redis)
+    elif reconcile_due:
+        task = asyncio.create_task(_reconcile_in_background(redis, project_id))
+        _reconcile_tasks.add(task)
+        task.add_done_callback(_reconcile_tasks.discard)
+    granted = max(granted, 0)
+
+    if granted < requested and limit is not None and await redis.set(
+        _limit_recheck_key(project_id), 1, ex=WAITLIST_COUNTER_LIMIT_RECHECK_SECONDS, nx=True
+    ):
+        await reconcile_signup_count(redis, project_id)
+        args[1] = requested - granted
+        more, _ = await _reserve_slots(keys=keys, args=args, client=redis)
+        granted += max(more, 0)
+
+    return granted
+
+
+async def release_signup_slots(redis: Redis, project_id: int, count: int = 1):
+    """
+    Give back reserved slots that did not turn into accepted signups.
+
+    Args:
+        redis (Redis): The Redis client.
+        project_id (int): The id of the project.
+        count (int): The number of slots to release.
+    """
+    if count > 0:
+        await redis.decrby(_counter_key(project_id), count)
+
+
+async def get_signup_count(redis: Redis, project_id: int, exact: bool = False) -> int:
+    """
+    Get the number of signups of a project from its counter.
+
+    The counter is updated on every accepted or released signup and
+    reconciled periodically, so it can briefly include signups that are
+    still being written.
+
+    Args:
+        redis (Redis): The Redis client.
+        project_id (int): The id of the project.
+        exact (bool): Count the documents in Mongo instead, and reset the counter to that.
+
+    Returns:
+        int: The number of signups.
+    """
+    if not exact:
+        count = await redis.get(_counter_key(project_id))
+        if count is not None:
+            return max(int(count), 0)
+
+    return await reconcile_signup_count(redis, project_id)
+
+
+async def record_last_signup(redis: Redis, project_id: int, dates_added: Iterable[datetime]):
+    """
+    Move a project's last signup time forward to the newest of the given signups.
+
+    Args:
+        redis (Redis): The Redis client.
+        project_id (int): The id of the project.
+        dates_added (Iterable[datetime]): The signup time of each accepted signup.
+    """
+    latest = max(dates_added, default=None)
+    if latest is not None:
+        await _set_max(keys=[_last_signup_key(project_id)], args=[latest.timestamp()], client=redis)
+
+
+async def get_signup_summaries(
+    redis: Redis, project_ids: List[int]
+) -> Dict[int, Tuple[int, Optional[datetime]]]:
+    """
+    Get the signup count and last signup time of several projects at once.
+
+    Both come from the maintained counters in a single MGET. Projects
+    without them (e.g. from before they were maintained) are computed
+    together with one grouped aggregation, whose counts reconcile their
+    counters the way reconcile_signup_count does, so signups still buffered
+    in the ingest stream are included.
+
+    Args:
+        redis (Redis): The Redis client.
+        project_ids (List[int]): The ids of the projects.
+
+    Returns:
+        Dict[int, Tuple[int, Optional[datetime]]]: The count and last signup time of each project.
+    """
+    if not project_ids:
+        return {}
+
+    keys = [_counter_key(project_id) for project_id in project_ids]
+    keys += [_last_signup_key(project_id) for project_id in project_ids]
+    values = await redis.mget(keys)
+    counts, last_signups = values[:len(project_ids)], values[len(project_ids):]
+
+    summaries = {}
+    missing = {}
+    for project_id, count, last_signup in zip(project_ids, counts, last_signups):
+        if count is None or (last_signup is None and int(count) > 0):
+            missing[project_id] = count
+            continue
+        last_signup_at = datetime.fromtimestamp(float(last_signup)) if last_signup is not None else None
+        summaries[project_id] = (max(int(count), 0), last_signup_at)
+
+    if missing:
+        pipeline = [
+            {"$match": {"project_id": {"$in": list(missing)}}},
+            {"$group": {"_id": "$project_id", "count": {"$sum": 1}, "last_signup": {"$max": "$date_added"}}},
+        ]
+        grouped = {
+            row["_id"]: row async for row in async_project_waitlist_analytics_collection.aggregate(pipeline)
+        }
+        for project_id, snapshot in missing.items():
+            row = grouped.get(project_id)
+            last_signup_at = row["last_signup"] if row else None
+            count = await _apply_count(redis, project_id, row["count"] if row else 0, snapshot)
+            summaries[project_id] = (count, last_signup_at)
+
+            if last_signup_at is not None:
+                await record_last_signup(redis, project_id, [last_signup_at])
+
+    return summaries
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from fastapi import HTTPException, status
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.config.settings import WAITLIST_LIVE_QUEUE_SIZE, WAITLIST_LIVE_MAX_LISTENERS
+
+logger = logging.getLogger(__name__)
+
+LIVE_CHANNEL_PREFIX = "waitlist:live:"
+
+
+def _channel(project_id: int) -> str:
+    return f"{LIVE_CHANNEL_PREFIX}{project_id}"
+
+
+async def publish_signups(redis: Redis, project_id: int, emails: List[str], dates_added: List[datetime]):
+    """
+    Publish accepted signups to the live feed of a project, as one message per batch.
+
+    Args:
+        redis (Redis): The Redis client.
+        project_id (int): The id of the project.
+        emails (List[str]): The accepted emails.
+        dates_added (List[datetime]): The signup time of each email.
+    """
+    message = json.dumps({
+        "project_id": project_id,
+        "signups": [
+            {"email": email, "date_added": date_added.isoformat()}
+            for email, date_added in zip(emails, dates_added)
+        ],
+    })
+    await redis.publish(_channel(project_id), message)
+
+
+class SignupBroker:
+    """
+    Fans the live feed channels out to the SSE listeners of this worker.
+
+    Every listener gets its own bounded queue, but the worker holds a single
+    pub/sub connection, subscribed to a project's channel only while that
+    project has listeners. A listener that falls behind loses its oldest
+    messages rather than holding memory or slowing the others down.
+    """
+
+    def __init__(self):
+        self._listeners: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._lock = asyncio.Lock()
+        self._redis: Optional[Redis] = None
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+
+    @property
+    def listener_count(self) -> int:
+        return sum(len(queues) for queues in self._listeners.values())
+
+    async def subscribe(self, redis: Redis, project_id: int) -> asyncio.Queue:
+        """
+        Start listening to a project's feed.
+
+        Args:
+            redis (Redis): The Redis client.
+            project_id (int): The id of the project.
+
+        Returns:
+            asyncio.Queue: Receives the JSON message of each published batch.
+        """
+        async with self._lock:
+            if self.listener_count >= WAITLIST_LIVE_MAX_LISTENERS:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many live listeners, try again later",
+                )
+
+            self._redis = redis
+            if self._pubsub is None:
+                self._pubsub = redis.pubsub(ignore_subscribe_messages=True)
+
+            channel = _channel(project_id)
+            if not self._listeners[channel]:
+                await self._pubsub.subscribe(channel)
+
+            queue = asyncio.Queue(maxsize=WAITLIST_LIVE_QUEUE_SIZE)
+            self._listeners[channel].add(queue)
+
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read())
+            return queue
+
+    async def unsubscribe(self, project_id: int, queue: asyncio.Queue):
+        """
+        Stop listening, unsubscribing from the channel once its last listener is gone.
+        """
+        async with self._lock:
+            channel = _channel(project_id)
+            self._listeners[channel].discard(queue)
+            if not self._listeners[channel]:
+                del self._listeners[channel]
+                if self._pubsub is not None:
+                    await self._pubsub.unsubscribe(channel)
+
+    def _dispatch(self, channel: str, data: str):
+        for queue in self._listeners.get(channel, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(data)
+
+    async def _read(self):
+        # Exits once no channel has listeners; the next subscribe starts it again.
+        # Any failure is logged and retried with backoff: if the reader died,
+        # every current listener would only get heartbeats until the next subscribe.
+        backoff = 1
+        broken = False
+        while self._listeners:
+            try:
+                if broken:
+                    await self._resubscribe()
+                    broken = False
+                message = await self._pubsub.get_message(timeout=1.0)
+                if message is not None and message["type"] == "message":
+                    self._dispatch(message["channel"], message["data"])
+                backoff = 1
+            except asyncio.CancelledError:
+                raise
+            except RedisConnectionError as e:
+                # The connection re-subscribes to its channels when it comes back.
+                logger.warning("Live signup subscription lost: %s", e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            except Exception:
+                logger.exception("Live signup reader failed")
+                broken = True
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    async def _resubscribe(self):
+        # Replaces the pub/sub connection, subscribed to every channel that has listeners.
+        async with self._lock:
+            pubsub, self._pubsub = self._pubsub, self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.aclose()
+            except Exception:
+                logger.debug("Could not close the live signup subscription", exc_info=True)
+            if self._listeners:
+                await self._pubsub.subscribe(*self._listeners)
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        self._listeners.clear()
+
+
+signup_broker = SignupBroker()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -19,3 +19,20 @@ class WaitlistResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class BulkWaitlistItemResult(BaseModel):
+    index: int
+    email: Optional[str] = None
+    status: str = Field(..., description="One of accepted, duplicate, invalid, over_limit or failed.")
+    error: Optional[str] = None
+
+
+class BulkWaitlistResponse(BaseModel):
+    message: str
+    accepted: int
+    duplicates: int
+    invalid: int
+    over_limit: int
+    failed: int
+    results: List[BulkWaitlistItemResult]
@@ -0,0 +1,366 @@
+import json
+import re
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+import orjson
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Request, status
+from pydantic import ValidationError
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+from redis.asyncio import Redis
+
+from src.config.settings import WAITLIST_BULK_MAX_BODY_BYTES, WAITLIST_BULK_MAX_LINE_BYTES
+from src.config.db.mongo_management.async_mongo_manager import (
+    async_project_waitlist_collection,
+    async_project_waitlist_list_collection,
+)
+from src.apps.waitlist.schemas.waitlist_schema import WaitlistRequest
+from src.apps.waitlist.bloom import bloom_add
+from src.apps.waitlist.rollups import record_signup_rollups, to_local_naive
+from src.apps.waitlist.counters import record_last_signup
+from src.apps.waitlist.live import publish_signups
+from src.apps.base.http_cache import bump_resource_versions, waitlist_resource
+from src.apps.base.pagination import encode_cursor, decode_cursor
+
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+# Only the fields list responses render (plus _id, kept for cursors).
+WAITLIST_ROW_PROJECTION = {"email": 1, "date_added": 1, "project_id": 1}
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonlines")
+
+# Yielded by iter_bulk_payload in place of an NDJSON line over WAITLIST_BULK_MAX_LINE_BYTES.
+OVERSIZED_LINE = object()
+
+
+async def iter_bulk_payload(request: Request) -> AsyncIterator[Any]:
+    """
+    Iterate over the raw items of a bulk signup request body.
+
+    NDJSON bodies are consumed from the request stream line by line so the
+    full body is never held in memory. Anything else is parsed as a JSON
+    array of at most WAITLIST_BULK_MAX_BODY_BYTES.
+
+    Args:
+        request (Request): The incoming request.
+
+    Yields:
+        Any: One undecoded NDJSON line (bytes) or one decoded array element.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    if content_type in NDJSON_CONTENT_TYPES:
+        async for line in _iter_ndjson_lines(request):
+            yield line
+        return
+
+    for item in await _read_json_array(request):
+        yield item
+
+
+async def _iter_ndjson_lines(request: Request) -> AsyncIterator[Any]:
+    # A line longer than WAITLIST_BULK_MAX_LINE_BYTES is dropped as it
+    # arrives and yielded as OVERSIZED_LINE.
+    pending = b""
+    skipping = False
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if skipping:
+                # The end of an over-long line that was already reported.
+                skipping = False
+            elif len(line) > WAITLIST_BULK_MAX_LINE_BYTES:
+                yield OVERSIZED_LINE
+            elif line.strip():
+                yield line
+        if len(pending) > WAITLIST_BULK_MAX_LINE_BYTES:
+            if not skipping:
+                yield OVERSIZED_LINE
+                skipping = True
+            pending = b""
+    if pending.strip() and not skipping:
+        yield pending
+
+
+async def _read_json_array(request: Request) -> list:
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"JSON array bodies are limited to {WAITLIST_BULK_MAX_BODY_BYTES} bytes; send NDJSON instead",
+    )
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > WAITLIST_BULK_MAX_BODY_BYTES:
+        raise too_large
+
+    # Content-Length may be missing (chunked) or wrong, so count while reading too.
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > WAITLIST_BULK_MAX_BODY_BYTES:
+            raise too_large
+
+    try:
+        items = json.loads(body)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body must be a JSON array or NDJSON",
+        )
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body must be a JSON array or NDJSON",
+        )
+    return items
+
+
+def normalize_email(email: str) -> str:
+    """
+    Get the form of an email that search matches against.
+    """
+    return email.strip().lower()
+
+
+def build_signup_document(project_id: int, email: str, date_added: datetime) -> dict:
+    """
+    Build the project_waitlist document for a signup.
+
+    Args:
+        project_id (int): The id of the project.
+        email (str): The email as submitted.
+        date_added (datetime): The signup time.
+
+    Returns:
+        dict: The document to insert.
+    """
+    return {
+        "email": email,
+        "email_normalized": normalize_email(email),
+        "project_id": project_id,
+        "date_added": date_added,
+    }
+
+
+def parse_bulk_item(raw: Any) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Validate one bulk item against WaitlistRequest.
+
+    Args:
+        raw (Any): An NDJSON line or a decoded JSON value.
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: The email and ``None``, or ``None`` and the validation error.
+    """
+    if raw is OVERSIZED_LINE:
+        return None, f"Line is longer than {WAITLIST_BULK_MAX_LINE_BYTES} bytes"
+    if isinstance(raw, (bytes, str)):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return None, "Malformed JSON"
+    try:
+        return WaitlistRequest.model_validate(raw).email, None
+    except ValidationError as e:
+        return None, "; ".join(error["msg"] for error in e.errors())
+
+
+async def insert_project_signups(
+    project_id: int,
+    emails: List[str],
+    dates_added: Optional[List[datetime]] = None,
+) -> List[Tuple[str, Optional[str]]]:
+    """
+    Insert a batch of signups for a project with one unordered bulk write.
+
+    Duplicates are rejected by the unique (project_id, email) index and do
+    not stop the rest of the batch from being written.
+
+    Args:
+        project_id (int): The id of the project.
+        emails (List[str]): The emails to add.
+        dates_added (List[datetime], optional): The signup time of each email. Defaults to now.
+
+    Returns:
+        List[Tuple[str, Optional[str]]]: The status and error for each email, in input order.
+    """
+    if not emails:
+        return []
+
+    if dates_added is None:
+        dates_added = [datetime.now()] * len(emails)
+    documents = [
+        build_signup_document(project_id, email, date_added)
+        for email, date_added in zip(emails, dates_added)
+    ]
+    results = [("accepted", None)] * len(documents)
+
+    try:
+        await async_project_waitlist_collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get("writeErrors", []):
+            if error.get("code") == DUPLICATE_KEY_ERROR_CODE:
+                results[error["index"]] = ("duplicate", "Email already in the waitlist")
+            else:
+                results[error["index"]] = ("failed", error.get("errmsg"))
+
+    return results
+
+
+async def record_accepted_signups(redis: Redis, project_id: int, emails: List[str], dates_added: List[datetime]):
+    """
+    Update the derived per-project state after signups are written to Mongo.
+
+    Args:
+        redis (Redis): The Redis client.
+        project_id (int): The id of the project.
+        emails (List[str]): The emails that were written.
+        dates_added (List[datetime]): The signup time of each email.
+    """
+    if not emails:
+        return
+
+    await bloom_add(redis, project_id, emails)
+    await record_signup_rollups(redis, project_id, dates_added)
+    await record_last_signup(redis, project_id, dates_added)
+    await bump_resource_versions(redis, waitlist_resource(project_id))
+    await publish_signups(redis, project_id, emails, dates_added)
+
+
+def _cursor_for(document: dict, direction: str) -> str:
+    return encode_cursor({"d": document["date_added"].isoformat(), "i": str(document["_id"]), "dir": direction})
+
+
+async def get_project_waitlist_page(
+    project_id: int,
+    size: int,
+    cursor: Optional[str] = None,
+    filters: Optional[dict] = None,
+) -> Tuple[List[dict], Optional[str], Optional[str]]:
+    """
+    Get one page of a project's waitlist in (date_added, _id) order using keyset pagination.
+
+    Each page is a range scan on the (project_id, date_added, _id) index
+    starting at the cursor, so deep pages cost the same as the first one.
+
+    Args:
+        project_id (int): The id of the project.
+        size (int): The page size.
+        cursor (str, optional): A next/prev cursor from a previous page; ``None`` for the first page.
+        filters (dict, optional): Extra Mongo conditions the rows must match.
+
+    Returns:
+        Tuple[List[dict], Optional[str], Optional[str]]: The documents, the next cursor and the previous cursor.
+    """
+    conditions = [{"project_id": project_id}]
+    if filters:
+        conditions.append(filters)
+
+    direction = "next"
+    if cursor:
+        position = decode_cursor(cursor)
+        direction = position.get("dir")
+        try:
+            date_added = datetime.fromisoformat(position["d"])
+            document_id = ObjectId(position["i"])
+        except (KeyError, TypeError, ValueError, InvalidId):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if direction not in ("next", "prev"):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+        operator = "$gt" if direction == "next" else "$lt"
+        conditions.append({
+            "$or": [
+                {"date_added": {operator: date_added}},
+                {"date_added": date_added, "_id": {operator: document_id}},
+            ]
+        })
+
+    sort_order = ASCENDING if direction == "next" else DESCENDING
+    query = conditions[0] if len(conditions) == 1 else {"$and": conditions}
+    documents = await (
+        async_project_waitlist_list_collection.find(query, WAITLIST_ROW_PROJECTION)
+        .sort([("date_added", sort_order), ("_id", sort_order)])
+        .limit(size + 1)
+        .to_list(size + 1)
+    )
+
+    has_more = len(documents) > size
+    documents = documents[:size]
+    if direction == "prev":
+        documents.reverse()
+
+    if not documents:
+        return documents, None, None
+
+    if direction == "next":
+        next_cursor = _cursor_for(documents[-1], "next") if has_more else None
+        prev_cursor = _cursor_for(documents[0], "prev") if cursor else None
+    else:
+        next_cursor = _cursor_for(documents[-1], "next")
+        prev_cursor = _cursor_for(documents[0], "prev") if has_more else None
+
+    return documents, next_cursor, prev_cursor
+
+
+def render_waitlist_rows(message: str, documents: List[dict], **fields) -> bytes:
+    """
+    Serialize waitlist documents straight to a JSON response body.
+
+    Produces the same shape as the WaitlistResponse based schemas, without
+    building a Pydantic model per row and re-encoding the result: rows are
+    copied once into plain dicts and orjson writes the bytes, datetimes included.
+
+    Args:
+        message (str): The response message.
+        documents (List[dict]): Documents fetched with WAITLIST_ROW_PROJECTION.
+        **fields: Other top level fields, e.g. ``total`` or the cursors.
+
+    Returns:
+        bytes: The JSON body.
+    """
+    data = [
+        {"email": document["email"], "date_added": document["date_added"], "project_id": document.get("project_id")}
+        for document in documents
+    ]
+    return orjson.dumps({"message": message, "data": data, **fields})
+
+
+def build_waitlist_search_filter(
+    query: Optional[str] = None,
+    match: str = "prefix",
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> dict:
+    """
+    Build the Mongo conditions of a waitlist search.
+
+    Prefix matches are anchored regexes on email_normalized, which Mongo
+    answers as a range scan of the (project_id, email_normalized) index.
+    Substring matches scan that index's keys for the project rather than
+    the documents.
+
+    Args:
+        query (str, optional): The text to look for in the email.
+        match (str): ``prefix`` or ``substring``.
+        date_from (datetime, optional): Only signups at or after this time; aware values are converted to local time.
+        date_to (datetime, optional): Only signups before this time; aware values are converted to local time.
+
+    Returns:
+        dict: The conditions, to pass as ``filters`` to get_project_waitlist_page.
+    """
+    filters = {}
+    if query:
+        pattern = re.escape(normalize_email(query))
+        filters["email_normalized"] = {"$regex": f"^{pattern}" if match == "prefix" else pattern}
+
+    if date_from or date_to:
+        filters["date_added"] = {}
+        if date_from:
+            filters["date_added"]["$gte"] = to_local_naive(date_from)
+        if date_to:
+            filters["date_added"]["$lt"] = to_local_naive(date_to)
+
+    return filters
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import List, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from src.config.settings import (
+    WAITLIST_INGEST_MODE,
+    WAITLIST_STREAM_KEY,
+    WAITLIST_STREAM_GROUP,
+    WAITLIST_STREAM_BATCH_SIZE,
+    WAITLIST_STREAM_BLOCK_MS,
+    WAITLIST_STREAM_CLAIM_IDLE_MS,
+    WAITLIST_STREAM_MAX_DELIVERIES,
+    WAITLIST_STREAM_DEAD_LETTER_KEY,
+    WAITLIST_STREAM_MAX_LAG,
+)
+from src.config.db.redis_management.redis_manager import register_script
+from src.apps.waitlist.service import insert_project_signups, record_accepted_signups
+from src.apps.waitlist.counters import release_signup_slots, stream_pending_key
+
+logger = logging.getLogger(__name__)
+
+CONSUMER_NAME = f"{socket.gethostname()}-{os.getpid()}"
+
+# Acks and deletes entries ARGV[2..] of group ARGV[1], taking the number that
+# were actually deleted off the project's buffered count in KEYS[2], so an
+# entry flushed twice by racing consumers is only subtracted once.
+ACK_AND_DELETE_SCRIPT = """
+redis.call('XACK', KEYS[1], ARGV[1], unpack(ARGV, 2))
+local deleted = redis.call('XDEL', KEYS[1], unpack(ARGV, 2))
+if deleted > 0 then
+    redis.call('DECRBY', KEYS[2], deleted)
+end
+return deleted
+"""
+
+_ack_and_delete = register_script(ACK_AND_DELETE_SCRIPT)
+
+_stream_lag = 0
+
+
+async def get_stream_lag(redis: Redis) -> int:
+    """
+    Get the number of signups buffered in the stream but not yet flushed to Mongo.
+
+    That is the consumer group's ``lag`` (entries not delivered yet) plus its
+    ``pending`` entries (delivered, not acknowledged). XINFO GROUPS reports
+    ``lag`` only on Redis 7 and later, and not when deleted entries make it
+    uncomputable; then XLEN is used instead, which counts the same entries
+    because flushed and dead-lettered entries are deleted from the stream.
+
+    Args:
+        redis (Redis): The Redis client.
+
+    Returns:
+        int: The number of buffered signups.
+    """
+    try:
+        groups = await redis.xinfo_groups(WAITLIST_STREAM_KEY)
+    except ResponseError:
+        # The stream doesn't exist yet.
+        return 0
+
+    for group in groups:
+        if group["name"] == WAITLIST_STREAM_GROUP and group.get("lag") is not None:
+            return int(group["lag"]) + int(group.get("pending") or 0)
+    return await redis.xlen(WAITLIST_STREAM_KEY)
+
+
+def ingest_uses_stream() -> bool:
+    """
+    Whether new signups should be buffered in the Redis stream.
+
+    The stream is bypassed while its lag is above WAITLIST_STREAM_MAX_LAG so
+    a stalled flusher cannot grow the buffer without bound.
+    """
+    return WAITLIST_INGEST_MODE == "stream" and _stream_lag < WAITLIST_STREAM_MAX_LAG
+
+
+async def enqueue_signup(redis: Redis, project_id: int, email: str, date_added: datetime) -> str:
+    """
+    Append a signup to the ingest stream.
+
+    Args:
+        redis (Redis): The Redis client.
+        project_id (int): The id of the project.
+        email (str): The email to add.
+        date_added (datetime): The signup time.
+
+    Returns:
+        str: The stream entry id.
+    """
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.xadd(
+            WAITLIST_STREAM_KEY,
+            {"project_id": project_id, "email": email, "date_added": date_added.isoformat()},
+        )
+        pipe.incr(stream_pending_key(project_id))
+        entry_id, _ = await pipe.execute()
+    return entry_id
+
+
+async def ensure_consumer_group(redis: Redis):
+    try:
+        await redis.xgroup_create(WAITLIST_STREAM_KEY, WAITLIST_STREAM_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def flush_entries(redis: Redis, entries: List[Tuple[str, dict]], redelivered: bool = False):
+    """
+    Write a batch of stream entries to Mongo and acknowledge them.
+
+    Entries are grouped per project and written with one bulk insert each.
+    Duplicates are dropped by the unique index. Entries that fail for any
+    other reason stay pending and are retried once they are claimed again.
+
+    Written entries are acknowledged before the counter and rollup
+    bookkeeping runs, so a failure there can't get them redelivered. A
+    duplicate in a redelivered batch may be the entry's own row, written by
+    a delivery that died before acknowledging it, so its slot is kept; if
+    it was a real duplicate, the next reconcile gives the slot back.
+
+    Args:
+        redis (Redis): The Redis client.
+        entries (List[Tuple[str, dict]]): The stream entry ids and fields.
+        redelivered (bool): Whether the entries were claimed from another delivery. Defaults to False.
+    """
+    by_project = defaultdict(list)
+    for entry_id, fields in entries:
+        if not fields:
+            # The entry was deleted after being delivered.
+            await redis.xack(WAITLIST_STREAM_KEY, WAITLIST_STREAM_GROUP, entry_id)
+            continue
+        by_project[int(fields["project_id"])].append((entry_id, fields))
+
+    for project_id, project_entries in by_project.items():
+        dates_added = [datetime.fromisoformat(fields["date_added"]) for _, fields in project_entries]
+        results = await insert_project_signups(
+            project_id,
+            [fields["email"] for _, fields in project_entries],
+            dates_added,
+        )
+        done_ids = []
+        accepted = []
+        duplicates = 0
+        for (entry_id, fields), date_added, (item_status, error) in zip(project_entries, dates_added, results):
+            if item_status == "failed":
+                logger.error("Could not flush signup %s for project %s: %s", entry_id, project_id, error)
+                continue
+            if item_status == "accepted":
+                accepted.append((fields["email"], date_added))
+            else:
+                duplicates += 1
+            done_ids.append(entry_id)
+
+        if done_ids:
+            await _ack_and_delete(
+                keys=[WAITLIST_STREAM_KEY, stream_pending_key(project_id)],
+                args=[WAITLIST_STREAM_GROUP, *done_ids],
+                client=redis,
+            )
+
+        # Slots were reserved when the signup was enqueued.
+        if not redelivered:
+            await release_signup_slots(redis, project_id, duplicates)
+
+        await record_accepted_signups(
+            redis,
+            project_id,
+            [email for email, _ in accepted],
+            [date_added for _, date_added in accepted],
+        )
+
+
+async def dead_letter_exhausted(redis: Redis, entries: List[Tuple[str, dict]]) -> List[Tuple[str, dict]]:
+    """
+    Move claimed entries that keep failing to the dead-letter stream.
+
+    An entry that already failed WAITLIST_STREAM_MAX_DELIVERIES deliveries
+    is copied to WAITLIST_STREAM_DEAD_LETTER_KEY (with its original id) and
+    removed from the ingest stream, so it stops being retried and holding
+    the pending list up. Its reserved signup slot is released.
+
+    Args:
+        redis (Redis): The Redis client.
+        entries (List[Tuple[str, dict]]): Entries just claimed by this consumer.
+
+    Returns:
+        List[Tuple[str, dict]]: The entries to flush again.
+    """
+    async with redis.pipeline(transaction=False) as pipe:
+        for entry_id, _ in entries:
+            pipe.xpending_range(WAITLIST_STREAM_KEY, WAITLIST_STREAM_GROUP, min=entry_id, max=entry_id, count=1)
+        pending = await pipe.execute()
+
+    retry = []
+    dead = []
+    for (entry_id, fields), info in zip(entries, pending):
+        if fields and info and info[0]["times_delivered"] > WAITLIST_STREAM_MAX_DELIVERIES:
+            dead.append((entry_id, fields, info[0]["times_delivered"]))
+        else:
+            retry.append((entry_id, fields))
+
+    if not dead:
+        return retry
+
+    by_project = defaultdict(list)
+    async with redis.pipeline(transaction=False) as pipe:
+        for entry_id, fields, deliveries in dead:
+            pipe.xadd(WAITLIST_STREAM_DEAD_LETTER_KEY, {**fields, "entry_id": entry_id, "deliveries": deliveries})
+            by_project[int(fields["project_id"])].append(entry_id)
+        await pipe.execute()
+
+    for project_id, entry_ids in by_project.items():
+        deleted = await _ack_and_delete(
+            keys=[WAITLIST_STREAM_KEY, stream_pending_key(project_id)],
+            args=[WAITLIST_STREAM_GROUP, *entry_ids],
+            client=redis,
+        )
+        await release_signup_slots(redis, project_id, deleted)
+    logger.error(
+        "Moved %s signups to %s after %s failed deliveries",
+        len(dead), WAITLIST_STREAM_DEAD_LETTER_KEY, WAITLIST_STREAM_MAX_DELIVERIES,
+    )
+    return retry
+
+
+async def refresh_stream_lag(redis: Redis):
+    global _stream_lag
+
+    _stream_lag = await get_stream_lag(redis)
+    if _stream_lag >= WAITLIST_STREAM_MAX_LAG:
+        logger.warning("Waitlist ingest stream lag is %s, writing signups directly", _stream_lag)
+
+
+async def run_stream_flusher(redis: Redis):
+    """
+    Drain the ingest stream into Mongo for the lifetime of the app.
+
+    Every worker joins the same consumer group, so entries are spread across
+    workers. Entries left pending by a worker that died are claimed by the
+    others after WAITLIST_STREAM_CLAIM_IDLE_MS, which makes delivery
+    at-least-once. An entry that still can't be flushed after
+    WAITLIST_STREAM_MAX_DELIVERIES deliveries is dead-lettered.
+    """
+    await ensure_consumer_group(redis)
+    last_claim = 0.0
+    # XAUTOCLAIM scans the pending list in pages; "0-0" once it has wrapped around.
+    claim_cursor = "0-0"
+
+    while True:
+        try:
+            if time.monotonic() - last_claim > WAITLIST_STREAM_CLAIM_IDLE_MS / 2000:
+                last_claim = time.monotonic()
+                claimed = await redis.xautoclaim(
+                    WAITLIST_STREAM_KEY,
+                    WAITLIST_STREAM_GROUP,
+                    CONSUMER_NAME,
+                    min_idle_time=WAITLIST_STREAM_CLAIM_IDLE_MS,
+                    start_id=claim_cursor,
+                    count=WAITLIST_STREAM_BATCH_SIZE,
+                )
+                claim_cursor, claimed_entries = claimed[0], claimed[1]
+                if claimed_entries:
+                    claimed_entries = await dead_letter_exhausted(redis, claimed_entries)
+                if claimed_entries:
+                    await flush_entries(redis, claimed_entries, redelivered=True)
+
+            response = await redis.xreadgroup(
+                WAITLIST_STREAM_GROUP,
+                CONSUMER_NAME,
+                {WAITLIST_STREAM_KEY: ">"},
+                count=WAITLIST_STREAM_BATCH_SIZE,
+                block=WAITLIST_STREAM_BLOCK_MS,
+            )
+            for _, entries in response or []:
+                await flush_entries(redis, entries)
+
+            await refresh_stream_lag(redis)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Waitlist ingest stream flush failed")
+            await asyncio.sleep(1)
@@ -0,0 +1,47 @@
+"""
+Fill in email_normalized on project_waitlist documents written before search existed.
+
+Usage:
+    python -m src.commands.backfill_normalized_emails [--batch-size N]
+"""
+import argparse
+import asyncio
+
+from pymongo import UpdateOne
+
+from src.config.db.mongo_management.async_mongo_manager import async_mongo_manager, async_project_waitlist_collection
+from src.apps.waitlist.service import normalize_email
+
+
+async def backfill(batch_size):
+    updated = 0
+    operations = []
+    cursor = async_project_waitlist_collection.find({"email_normalized": {"$exists": False}}, {"email": 1})
+
+    async for document in cursor:
+        operations.append(
+            UpdateOne({"_id": document["_id"]}, {"$set": {"email_normalized": normalize_email(document["email"])}})
+        )
+        if len(operations) >= batch_size:
+            await async_project_waitlist_collection.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+            print(f"{updated} documents updated")
+
+    if operations:
+        await async_project_waitlist_collection.bulk_write(operations, ordered=False)
+        updated += len(operations)
+
+    print(f"Done, {updated} documents updated")
+    async_mongo_manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill email_normalized on project_waitlist.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(backfill(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
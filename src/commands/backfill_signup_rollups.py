@@ -0,0 +1,40 @@
+"""
+Build the per-project signup rollups from the date_added of existing signups.
+
+Usage:
+    python -m src.commands.backfill_signup_rollups [PROJECT_ID ...]
+
+Without project ids every project with signups is rebuilt. Signups accepted
+while a project is being rebuilt can be missed; run it again if the
+project was busy.
+"""
+import argparse
+import asyncio
+
+from src.config.db.redis_management.redis_manager import redis_manager, get_redis
+from src.config.db.mongo_management.async_mongo_manager import async_mongo_manager, async_project_waitlist_collection
+from src.apps.waitlist.rollups import rebuild_signup_rollups
+
+
+async def backfill(project_ids):
+    redis = await get_redis()
+    if not project_ids:
+        project_ids = await async_project_waitlist_collection.distinct("project_id")
+
+    for project_id in project_ids:
+        count = await rebuild_signup_rollups(redis, project_id)
+        print(f"Project {project_id}: {count} signups")
+
+    await redis_manager.close()
+    async_mongo_manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the per-project signup rollups.")
+    parser.add_argument("project_ids", nargs="*", type=int, help="Projects to rebuild (default: all)")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.project_ids))
+
+
+if __name__ == "__main__":
+    main()
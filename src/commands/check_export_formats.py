@@ -0,0 +1,127 @@
+"""
+Round-trip generated rows through every export format and compression.
+
+Usage:
+    python -m src.commands.check_export_formats [--rows N] [--row-group-size N]
+
+Encodes the rows in cursor-sized batches the way exports do, decodes the
+result with the matching reader and compares. Formats whose optional
+dependency (pyarrow, zstandard) is not installed are reported as skipped.
+Exits non-zero when any format doesn't read back the rows it was given.
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import zlib
+from datetime import datetime, timedelta
+from xml.etree import ElementTree
+
+from src.config.settings import WAITLIST_EXPORT_BATCH_SIZE
+from src.apps.projects.exporters import (
+    EXPORT_COMPRESSIONS,
+    EXPORT_ENCODERS,
+    JsonEncoder,
+    ParquetEncoder,
+    pyarrow,
+    zstandard,
+)
+
+
+def make_rows(count):
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "email": f"user{index}+<&\"'>@example.com",
+            "date_added": (start + timedelta(seconds=index, microseconds=index)).isoformat(),
+        }
+        for index in range(count)
+    ]
+
+
+def encode(encoder, rows, compression=None):
+    compressor = EXPORT_COMPRESSIONS[compression][0]() if compression else None
+    chunks = [encoder.start()]
+    for offset in range(0, len(rows), WAITLIST_EXPORT_BATCH_SIZE):
+        chunks.append(encoder.encode(rows[offset:offset + WAITLIST_EXPORT_BATCH_SIZE]))
+    chunks.append(encoder.end())
+
+    data = b"".join(chunk.encode() if isinstance(chunk, str) else chunk for chunk in chunks)
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    return data
+
+
+def decompress(data, compression):
+    if compression == "gzip":
+        return zlib.decompress(data, wbits=31)
+    if compression == "zstd":
+        return zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)).read()
+    return data
+
+
+def decode(extension_type, data):
+    if extension_type == "csv":
+        return list(csv.DictReader(io.StringIO(data.decode())))
+    if extension_type == "json":
+        return json.loads(data)
+    if extension_type == "jsonl":
+        return [json.loads(line) for line in data.decode().splitlines()]
+    if extension_type == "xml":
+        return [{field.tag: field.text for field in item} for item in ElementTree.fromstring(data)]
+
+    table = pyarrow.parquet.read_table(io.BytesIO(data))
+    return [
+        {"email": email, "date_added": date_added.isoformat()}
+        for email, date_added in zip(table["email"].to_pylist(), table["date_added"].to_pylist())
+    ]
+
+
+def check(rows, row_group_size):
+    cases = [(extension_type, None, False) for extension_type in ("csv", "json", "jsonl", "xml")]
+    cases += [("json", None, True), ("parquet", None, False)]
+    cases += [
+        (extension_type, compression, False)
+        for extension_type in ("csv", "jsonl")
+        for compression in EXPORT_COMPRESSIONS
+    ]
+
+    failed = False
+    for extension_type, compression, pretty in cases:
+        name = extension_type + (f"+{compression}" if compression else "") + (" (pretty)" if pretty else "")
+        if (extension_type == "parquet" and pyarrow is None) or (compression == "zstd" and zstandard is None):
+            print(f"{name}: skipped, optional dependency not installed")
+            continue
+
+        if extension_type == "parquet":
+            encoder = ParquetEncoder(row_group_size=row_group_size)
+        elif pretty:
+            encoder = JsonEncoder(pretty=True)
+        else:
+            encoder = EXPORT_ENCODERS[extension_type]()
+        data = encode(encoder, rows, compression)
+        ok = decode(extension_type, decompress(data, compression)) == rows
+
+        detail = f"{len(data)} bytes"
+        if extension_type == "parquet":
+            metadata = pyarrow.parquet.ParquetFile(io.BytesIO(data)).metadata
+            detail += f", {metadata.num_row_groups} row groups"
+        print(f"{name}: {'ok' if ok else 'MISMATCH'} ({detail})")
+        failed = failed or not ok
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-trip rows through every export format.")
+    parser.add_argument("--rows", type=int, default=2500, help="Number of rows to export (default: 2500)")
+    parser.add_argument(
+        "--row-group-size", type=int, default=1000, help="Parquet row group size to check with (default: 1000)"
+    )
+    args = parser.parse_args()
+    if not check(make_rows(args.rows), args.row_group_size):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Rebuild the per-project signup Bloom filters from Mongo.
+
+Usage:
+    python -m src.commands.rebuild_bloom_filters [PROJECT_ID ...]
+
+Without project ids every project with signups is rebuilt.
+"""
+import argparse
+import asyncio
+
+from src.config.db.redis_management.redis_manager import redis_manager, get_redis
+from src.config.db.mongo_management.async_mongo_manager import async_mongo_manager, async_project_waitlist_collection
+from src.apps.waitlist.bloom import rebuild_bloom_filter, BLOOM_SIZE_BITS, BLOOM_HASH_COUNT
+
+
+async def rebuild(project_ids):
+    redis = await get_redis()
+    if not project_ids:
+        project_ids = await async_project_waitlist_collection.distinct("project_id")
+
+    print(f"Filter size: {BLOOM_SIZE_BITS} bits, {BLOOM_HASH_COUNT} hashes")
+    for project_id in project_ids:
+        count = await rebuild_bloom_filter(redis, project_id)
+        print(f"Project {project_id}: {count} emails")
+
+    await redis_manager.close()
+    async_mongo_manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the per-project signup Bloom filters.")
+    parser.add_argument("project_ids", nargs="*", type=int, help="Projects to rebuild (default: all)")
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.project_ids))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import logging
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+from pymongo.read_preferences import (
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+    Nearest,
+)
+import certifi
+
+from src.config.settings import (
+    MONGO_DB_URI,
+    MONGO_DB_NAME,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_INGEST_READ_PREFERENCE,
+    MONGO_LIST_READ_PREFERENCE,
+    MONGO_EXPORT_READ_PREFERENCE,
+    MONGO_ANALYTICS_READ_PREFERENCE,
+    MONGO_MAX_STALENESS_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+READ_PREFERENCE_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+OPERATION_READ_PREFERENCES = {
+    "ingest": MONGO_INGEST_READ_PREFERENCE,
+    "list": MONGO_LIST_READ_PREFERENCE,
+    "export": MONGO_EXPORT_READ_PREFERENCE,
+    "analytics": MONGO_ANALYTICS_READ_PREFERENCE,
+}
+
+
+def build_read_preference(mode: str, max_staleness: int = MONGO_MAX_STALENESS_SECONDS):
+    """
+    Build a read preference from its name.
+
+    Args:
+        mode (str): primary, primaryPreferred, secondary, secondaryPreferred or nearest.
+        max_staleness (int): How far behind the primary a secondary may be, in seconds; -1 for no bound.
+
+    Returns:
+        The pymongo read preference.
+    """
+    if mode not in READ_PREFERENCE_MODES:
+        raise ValueError(f"Unknown Mongo read preference {mode!r}")
+    if mode == "primary":
+        return Primary()
+    return READ_PREFERENCE_MODES[mode](max_staleness=max_staleness)
+
+
+class AsyncMongoManager:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._client = None
+        return cls._instance
+
+    def __init__(self):
+        if self._client:
+            return
+
+        # Motor binds to the running event loop lazily, so one client (and
+        # its connection pool) is shared by every request on the worker.
+        self._client = AsyncIOMotorClient(
+            MONGO_DB_URI,
+            tlsCAFile=certifi.where(),
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+            waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        )
+        self._db = self._client[MONGO_DB_NAME]
+
+    def get_database(self):
+        return self._db
+
+    def get_collection(self, name: str, operation: str = "ingest"):
+        """
+        Get a collection that reads with the preference of an operation class.
+
+        Args:
+            name (str): The name of the collection.
+            operation (str): ingest, list, export or analytics.
+        """
+        read_preference = build_read_preference(OPERATION_READ_PREFERENCES[operation])
+        return self._db[name].with_options(read_preference=read_preference)
+
+    def close(self):
+        self._client.close()
+
+
+async_mongo_manager = AsyncMongoManager()
+
+async_mongo_db = async_mongo_manager.get_database()
+
+async_waitlist_collection = async_mongo_manager.get_collection("waitlist")
+async_project_waitlist_collection = async_mongo_manager.get_collection("project_waitlist")
+
+# Reads that tolerate a little lag, routed away from the primary that takes the signups.
+async_project_waitlist_list_collection = async_mongo_manager.get_collection("project_waitlist", "list")
+async_project_waitlist_export_collection = async_mongo_manager.get_collection("project_waitlist", "export")
+async_project_waitlist_analytics_collection = async_mongo_manager.get_collection("project_waitlist", "analytics")
+
+
+async def get_mongo():
+    return async_mongo_manager.get_database()
+
+
+async def ensure_indexes():
+    """
+    Create the indexes the waitlist collections rely on.
+
+    The unique indexes back the single-write signup path: a duplicate email
+    surfaces as a DuplicateKeyError from the insert instead of needing a
+    lookup first. Creating an index that already exists is a no-op.
+
+    Raises:
+        RuntimeError: A unique index could not be built, e.g. because of
+            existing duplicates; without it duplicate signups would be
+            inserted silently, so the app must not start.
+    """
+    index_specs = [
+        (
+            async_waitlist_collection,
+            [("email", ASCENDING)],
+            {"name": "email_unique", "unique": True},
+        ),
+        (
+            async_project_waitlist_collection,
+            [("project_id", ASCENDING), ("email", ASCENDING)],
+            {"name": "project_id_email_unique", "unique": True},
+        ),
+        (
+            # Keyset pagination and exports walk a project in signup order.
+            async_project_waitlist_collection,
+            [("project_id", ASCENDING), ("date_added", ASCENDING), ("_id", ASCENDING)],
+            {"name": "project_id_date_added_id"},
+        ),
+        (
+            # Email prefix search within a project.
+            async_project_waitlist_collection,
+            [("project_id", ASCENDING), ("email_normalized", ASCENDING)],
+            {"name": "project_id_email_normalized"},
+        ),
+    ]
+    for collection, keys, options in index_specs:
+        try:
+            await collection.create_index(keys, **options)
+        except OperationFailure as e:
+            if options.get("unique"):
+                raise RuntimeError(
+                    f"Could not create unique index {options['name']} on {collection.name}; "
+                    f"remove the duplicate documents and restart: {e}"
+                ) from e
+            logger.error("Could not create index %s on %s: %s", options["name"], collection.name, e)
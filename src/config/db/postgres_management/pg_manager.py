@@ -1,8 +1,8 @@
 from sqlalchemy import create_engine, MetaData
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.pool import NullPool
 from sqlalchemy.orm import sessionmaker
-from databases import Database
 from pydantic import PostgresDsn
 
 from src.config import settings
@@ -17,6 +17,16 @@ database_url = PostgresDsn.build(
 )
 
 DATABASE_URL = str(database_url)
+
+async_database_url = PostgresDsn.build(
+    scheme="postgresql+asyncpg",
+    username=settings.DB_USER,
+    password=settings.DB_PASSWORD,
+    host=settings.DB_HOST,
+    path=f"{settings.DB_NAME}",
+)
+
+ASYNC_DATABASE_URL = str(async_database_url)
 # SQLAlchemy specific code
 engine = create_engine(
     DATABASE_URL,
@@ -30,12 +40,23 @@ engine = create_engine(
 metadata = MetaData()
 Base = declarative_base()
 
-# Async database connection
-database = Database(DATABASE_URL)
+# Async engine used by the API; queries no longer block the event loop
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={"timeout": 10},
+    pool_size=10,
+    max_overflow=20,
+    pool_timeout=30,
+    pool_recycle=1800,
+    pool_pre_ping=True,
+)
 
-# Session maker for SQLAlchemy
+# Session maker for SQLAlchemy (sync, for scripts and table creation)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async session maker; objects stay usable after commit without a reload
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 
 # Dependency to get DB session
 def get_db():
@@ -44,3 +65,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency to get an async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -33,4 +33,14 @@ class RedisManager:
 redis_manager = RedisManager()
 
 async def get_redis():
-    return await redis_manager.get_redis()
\ No newline at end of file
+    return await redis_manager.get_redis()
+
+
+def register_script(script: str):
+    """
+    Register a Lua script once, at import time, instead of on every call.
+
+    The script runs on the shared client; pass ``client=`` when calling it to
+    run it on another client or pipeline.
+    """
+    return redis_manager._redis.register_script(script)
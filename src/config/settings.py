@@ -2,7 +2,7 @@ import os
 import pytz
 from pathlib import Path
 
-from decouple import config
+from decouple import config, Csv
 
 from fastapi.templating import Jinja2Templates
 from src.apps.base.s3_helpers import get_s3_object
@@ -16,6 +16,11 @@ AWS_ACCESS_KEY_ID = config("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = config("AWS_SECRET_ACCESS_KEY")
 AWS_REGION = config("AWS_REGION")
 BUCKET_NAME = config("BUCKET_NAME")
+# Point at a local S3 stand-in (MinIO, LocalStack) with e.g. http://localhost:9000.
+S3_ENDPOINT_URL = config("S3_ENDPOINT_URL", default=None)
+S3_MAX_POOL_CONNECTIONS = config("S3_MAX_POOL_CONNECTIONS", default=10, cast=int)
+# Every part of a multipart upload but the last must be at least 5 MiB.
+S3_MULTIPART_PART_SIZE = max(config("S3_MULTIPART_PART_SIZE", default=8 * 1024 * 1024, cast=int), 5 * 1024 * 1024)
 
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
@@ -26,6 +31,98 @@ ALGORITHM = "HS256"
 
 MONGO_DB_URI = config("MONGO_DB_URI")
 MONGO_DB_NAME = config("MONGO_DB_NAME")
+MONGO_MAX_POOL_SIZE = config("MONGO_MAX_POOL_SIZE", default=100, cast=int)
+MONGO_MIN_POOL_SIZE = config("MONGO_MIN_POOL_SIZE", default=0, cast=int)
+MONGO_MAX_IDLE_TIME_MS = config("MONGO_MAX_IDLE_TIME_MS", default=60000, cast=int)
+MONGO_WAIT_QUEUE_TIMEOUT_MS = config("MONGO_WAIT_QUEUE_TIMEOUT_MS", default=5000, cast=int)
+
+# Read preference per operation class: primary, primaryPreferred, secondary,
+# secondaryPreferred or nearest. Ingest stays on the primary; the heavy reads
+# go to secondaries that are at most MONGO_MAX_STALENESS_SECONDS behind
+# (Mongo's minimum is 90, -1 means no bound).
+MONGO_INGEST_READ_PREFERENCE = config("MONGO_INGEST_READ_PREFERENCE", default="primary")
+MONGO_LIST_READ_PREFERENCE = config("MONGO_LIST_READ_PREFERENCE", default="secondaryPreferred")
+MONGO_EXPORT_READ_PREFERENCE = config("MONGO_EXPORT_READ_PREFERENCE", default="secondaryPreferred")
+MONGO_ANALYTICS_READ_PREFERENCE = config("MONGO_ANALYTICS_READ_PREFERENCE", default="secondaryPreferred")
+MONGO_MAX_STALENESS_SECONDS = config("MONGO_MAX_STALENESS_SECONDS", default=90, cast=int)
+
+WAITLIST_BULK_BATCH_SIZE = config("WAITLIST_BULK_BATCH_SIZE", default=1000, cast=int)
+WAITLIST_BULK_MAX_ITEMS = config("WAITLIST_BULK_MAX_ITEMS", default=100000, cast=int)
+# An NDJSON line holds one signup; anything longer is reported invalid without being buffered.
+WAITLIST_BULK_MAX_LINE_BYTES = config("WAITLIST_BULK_MAX_LINE_BYTES", default=4096, cast=int)
+# A JSON array body has to be read whole before it can be parsed, so it is capped as a whole.
+WAITLIST_BULK_MAX_BODY_BYTES = config("WAITLIST_BULK_MAX_BODY_BYTES", default=10 * 1024 * 1024, cast=int)
+WAITLIST_EXPORT_BATCH_SIZE = config("WAITLIST_EXPORT_BATCH_SIZE", default=1000, cast=int)
+# Rows buffered per Parquet row group; cursor batches are far too small for one each.
+WAITLIST_EXPORT_PARQUET_ROW_GROUP_SIZE = config("WAITLIST_EXPORT_PARQUET_ROW_GROUP_SIZE", default=65536, cast=int)
+# Delta exports stop at signups older than this, so rows still being written
+# (stream ingest, secondary lag) land in the next delta rather than being skipped.
+# Keep it above the ingest stream's flush delay plus MONGO_MAX_STALENESS_SECONDS.
+WAITLIST_EXPORT_SETTLE_SECONDS = config("WAITLIST_EXPORT_SETTLE_SECONDS", default=180, cast=int)
+
+# Export jobs run in the worker process (Procfile "worker"), queued in Redis.
+EXPORT_WORKER_CONCURRENCY = config("EXPORT_WORKER_CONCURRENCY", default=2, cast=int)
+EXPORT_JOB_MAX_ATTEMPTS = config("EXPORT_JOB_MAX_ATTEMPTS", default=3, cast=int)
+EXPORT_JOB_RETRY_BACKOFF_SECONDS = config("EXPORT_JOB_RETRY_BACKOFF_SECONDS", default=30, cast=int)
+# A running job whose worker hasn't reported progress for this long is retried.
+EXPORT_JOB_STALE_SECONDS = config("EXPORT_JOB_STALE_SECONDS", default=300, cast=int)
+EXPORT_JOB_TTL = config("EXPORT_JOB_TTL", default=60 * 60 * 24, cast=int)
+# A finished export is reused, with a fresh download link, while the waitlist
+# is unchanged for up to this long.
+EXPORT_CACHE_TTL = config("EXPORT_CACHE_TTL", default=60 * 60 * 24, cast=int)
+# Export files named per export (cached and delta exports) are deleted from S3
+# by the export worker this long after they were written. The default outlives
+# the cache entry plus the hour a download link handed out from it is valid.
+EXPORT_FILE_RETENTION_SECONDS = config(
+    "EXPORT_FILE_RETENTION_SECONDS", default=EXPORT_CACHE_TTL + 60 * 60, cast=int
+)
+if EXPORT_FILE_RETENTION_SECONDS < EXPORT_CACHE_TTL:
+    raise ValueError("EXPORT_FILE_RETENTION_SECONDS must be at least EXPORT_CACHE_TTL")
+
+# "direct" writes signups to Mongo in the request; "stream" appends them to a
+# Redis stream that a background consumer group flushes to Mongo in batches.
+WAITLIST_INGEST_MODE = config("WAITLIST_INGEST_MODE", default="direct")
+WAITLIST_STREAM_KEY = config("WAITLIST_STREAM_KEY", default=f"waitlist:ingest:{ENV_NAME}")
+WAITLIST_STREAM_GROUP = config("WAITLIST_STREAM_GROUP", default="waitlist-flushers")
+WAITLIST_STREAM_BATCH_SIZE = config("WAITLIST_STREAM_BATCH_SIZE", default=500, cast=int)
+WAITLIST_STREAM_BLOCK_MS = config("WAITLIST_STREAM_BLOCK_MS", default=1000, cast=int)
+WAITLIST_STREAM_CLAIM_IDLE_MS = config("WAITLIST_STREAM_CLAIM_IDLE_MS", default=60000, cast=int)
+# An entry that fails to flush on this many deliveries is moved to the dead-letter stream.
+WAITLIST_STREAM_MAX_DELIVERIES = config("WAITLIST_STREAM_MAX_DELIVERIES", default=5, cast=int)
+WAITLIST_STREAM_DEAD_LETTER_KEY = config(
+    "WAITLIST_STREAM_DEAD_LETTER_KEY", default=f"waitlist:ingest:{ENV_NAME}:dead"
+)
+# Above this many unflushed entries the handler writes to Mongo directly again.
+WAITLIST_STREAM_MAX_LAG = config("WAITLIST_STREAM_MAX_LAG", default=100000, cast=int)
+
+# Sizing of the per-project Bloom filters used to skip duplicate lookups.
+WAITLIST_BLOOM_EXPECTED_ITEMS = config("WAITLIST_BLOOM_EXPECTED_ITEMS", default=100000, cast=int)
+WAITLIST_BLOOM_FALSE_POSITIVE_RATE = config("WAITLIST_BLOOM_FALSE_POSITIVE_RATE", default=0.01, cast=float)
+
+WAITLIST_COUNTER_RECONCILE_SECONDS = config("WAITLIST_COUNTER_RECONCILE_SECONDS", default=300, cast=int)
+# A project at its limit is reconciled before signups are turned away, at most this often.
+WAITLIST_COUNTER_LIMIT_RECHECK_SECONDS = config("WAITLIST_COUNTER_LIMIT_RECHECK_SECONDS", default=10, cast=int)
+
+# Live signup feed (SSE): per-listener buffer, keep-alive interval and per-worker cap.
+WAITLIST_LIVE_QUEUE_SIZE = config("WAITLIST_LIVE_QUEUE_SIZE", default=100, cast=int)
+WAITLIST_LIVE_HEARTBEAT_SECONDS = config("WAITLIST_LIVE_HEARTBEAT_SECONDS", default=15, cast=int)
+WAITLIST_LIVE_MAX_LISTENERS = config("WAITLIST_LIVE_MAX_LISTENERS", default=1000, cast=int)
+
+# Number of proxies in front of the app that append to X-Forwarded-For (the
+# Heroku router is one). The client address is the entry that many from the
+# right; everything left of it is client-supplied. 0 uses the socket address.
+TRUSTED_PROXY_COUNT = config("TRUSTED_PROXY_COUNT", default=1, cast=int)
+
+# Ingest rate limits shared across workers, e.g. "20/minute".
+WAITLIST_IP_RATE_LIMIT = config("WAITLIST_IP_RATE_LIMIT", default="20/minute")
+WAITLIST_API_KEY_RATE_LIMIT = config("WAITLIST_API_KEY_RATE_LIMIT", default="600/minute")
+# Comma separated overrides, e.g. "project:12=1200/minute,api_key:34=60/minute".
+WAITLIST_RATE_LIMIT_OVERRIDES = config("WAITLIST_RATE_LIMIT_OVERRIDES", default="", cast=Csv())
+
+# How long responses are replayed for a repeated Idempotency-Key, and how
+# long a key stays locked while its first request is running.
+IDEMPOTENCY_TTL = config("IDEMPOTENCY_TTL", default=60 * 60 * 24, cast=int)
+IDEMPOTENCY_LOCK_TTL = config("IDEMPOTENCY_LOCK_TTL", default=60, cast=int)
 
 # POSTGRES_DB_URI = config("POSTGRES_DB_URI")
 
@@ -39,6 +136,29 @@ REDIS_HOST = config("REDIS_HOST")
 REDIS_PORT = config("REDIS_PORT")
 REDIS_PASSWORD = config("REDIS_PASSWORD")
 
+API_KEY_CACHE_MAX_SIZE = config("API_KEY_CACHE_MAX_SIZE", default=10000, cast=int)
+API_KEY_LOCAL_CACHE_TTL = config("API_KEY_LOCAL_CACHE_TTL", default=30, cast=int)
+API_KEY_REDIS_CACHE_TTL = config("API_KEY_REDIS_CACHE_TTL", default=300, cast=int)
+API_KEY_NEGATIVE_CACHE_TTL = config("API_KEY_NEGATIVE_CACHE_TTL", default=10, cast=int)
+
+# Dashboard GET responses kept by ETag; the ETag changes whenever the resource does.
+HTTP_CACHE_TTL = config("HTTP_CACHE_TTL", default=30, cast=int)
+# Resource version keys expire this long after they were last set; a resource
+# that is read again afterwards just gets a new version (and new ETags).
+HTTP_CACHE_VERSION_TTL = config("HTTP_CACHE_VERSION_TTL", default=60 * 60 * 24 * 7, cast=int)
+# Responses read from Mongo secondaries are not cached until the resource has
+# been unchanged this long, so a lagging secondary can't pin a stale page to a
+# fresh ETag. It must cover MONGO_MAX_STALENESS_SECONDS, the most a secondary
+# may lag (Mongo's 90s minimum when that is unbounded).
+HTTP_CACHE_REPLICA_SETTLE_SECONDS = config(
+    "HTTP_CACHE_REPLICA_SETTLE_SECONDS", default=max(MONGO_MAX_STALENESS_SECONDS, 90), cast=int
+)
+if MONGO_LIST_READ_PREFERENCE != "primary" and HTTP_CACHE_REPLICA_SETTLE_SECONDS < MONGO_MAX_STALENESS_SECONDS:
+    raise ValueError(
+        "HTTP_CACHE_REPLICA_SETTLE_SECONDS must be at least MONGO_MAX_STALENESS_SECONDS "
+        "while waitlist pages are read from secondaries"
+    )
+
 SENTRY_DSN = config("SENTRY_DSN")
 
 BASE_DIR = Path(__file__).resolve().parent.parent
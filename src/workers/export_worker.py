@@ -0,0 +1,43 @@
+"""
+Run queued waitlist exports outside the API process.
+
+Usage:
+    python -m src.workers.export_worker
+
+Runs EXPORT_WORKER_CONCURRENCY exports at a time. On SIGTERM the running
+exports are put back on the queue for another worker.
+"""
+import asyncio
+import logging
+import signal
+
+from src.config.settings import EXPORT_WORKER_CONCURRENCY
+from src.config.db.redis_management.redis_manager import redis_manager, get_redis
+from src.config.db.mongo_management.async_mongo_manager import async_mongo_manager
+from src.apps.projects.export_jobs import run_export_worker
+
+logger = logging.getLogger(__name__)
+
+
+async def run():
+    redis = await get_redis()
+    tasks = [asyncio.create_task(run_export_worker(redis)) for _ in range(EXPORT_WORKER_CONCURRENCY)]
+
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, lambda: [task.cancel() for task in tasks])
+
+    logger.info("Export worker started with %s slots", EXPORT_WORKER_CONCURRENCY)
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    await redis_manager.close()
+    async_mongo_manager.close()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()